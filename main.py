@@ -4,16 +4,21 @@ import os
 import asyncio
 from routes.internal import background_health_checker
 from utils.router import include_route_modules
-from utils.worker import WorkerPool
+from utils.worker import WorkerPool, PoolOverloaded
+from modules.scrapper.ScrapperPool import ScrapperPool
+from modules.scrapper.BaseScrapper import configure_executor, shutdown_executor
+from utils.cache import CaptionCache
 from utils.config import Config
 from utils.healthChecker import healthChecker
-from utils.metrics import ResponseTimeTracker, ResponseTimeMiddleware
+from utils.metrics import ResponseTimeTracker, ResponseTimeMiddleware, EventLoopMonitor
 from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from slowapi.errors import RateLimitExceeded
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from contextlib import asynccontextmanager
 from fastapi.middleware.cors import CORSMiddleware
+from dotenv import load_dotenv
 
 
 
@@ -27,6 +32,7 @@ parser.add_argument('--debug', action='store_true')
 args = parser.parse_args()
 
 config = Config()
+load_dotenv()
 
 # --- Logging: guard against double configuration ---
 root_logger = logging.getLogger()
@@ -46,6 +52,22 @@ async def lifespan(app: FastAPI):
     app.state.worker_pool = WorkerPool()
 
     await app.state.worker_pool.initialize(config)
+
+    configure_executor(config.scrapper_max_concurrency)
+    caption_cache = CaptionCache(
+        config.caption_cache_path,
+        max_entries=config.caption_cache_max_entries,
+        ttl_seconds=config.caption_cache_ttl_seconds,
+        negative_ttl_seconds=config.caption_cache_negative_ttl_seconds,
+    )
+    app.state.scrapper_pool = ScrapperPool(
+        size=config.scrapper_pool_size, timeout=config.scrapper_timeout_s, cache=caption_cache
+    )
+    await app.state.scrapper_pool.initialize(
+        username=os.getenv("INSTAGRAM_USERNAME"),
+        password=os.getenv("INSTAGRAM_PASSWORD"),
+        session_file=os.getenv("INSTAGRAM_SESSION_FILE"),
+    )
     include_route_modules(app)
     
     healthChecker.initialize_routes(app)
@@ -54,9 +76,16 @@ async def lifespan(app: FastAPI):
     health_checker_task = asyncio.create_task(background_health_checker(app))
     app.state.health_checker_task = health_checker_task
     logger.info("Background health checker started")
+
+    app.state.loop_monitor.start()
     
     yield
     
+    await app.state.loop_monitor.stop()
+    await app.state.worker_pool.shutdown()
+    shutdown_executor()
+    caption_cache.close()
+
     # Cleanup: cancel the background task on shutdown
     if hasattr(app.state, 'health_checker_task'):
         app.state.health_checker_task.cancel()
@@ -71,6 +100,17 @@ app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
 
+async def _pool_overloaded_handler(request: Request, exc: PoolOverloaded):
+    # shed load fast so clients can retry elsewhere instead of timing out
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+app.add_exception_handler(PoolOverloaded, _pool_overloaded_handler)
+
+
 # in prod remove these, hack to work during testing
 app.add_middleware(
     CORSMiddleware,
@@ -84,6 +124,9 @@ app.add_middleware(
 response_tracker = ResponseTimeTracker()
 app.state.response_tracker = response_tracker
 
+# Measures how long handlers block the event loop
+app.state.loop_monitor = EventLoopMonitor()
+
 # Add response time tracking middleware
 # Note: This must be added after other middlewares to measure total response time
 app.add_middleware(ResponseTimeMiddleware, tracker=response_tracker)
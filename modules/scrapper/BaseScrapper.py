@@ -1,22 +1,161 @@
+import asyncio
+import threading
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+
+DEFAULT_MAX_CONCURRENCY = 4
+
+
+class ScrapperTimeout(TimeoutError):
+    """A scrapper call took longer than its timeout."""
+
+
+class PostUnavailable(Exception):
+    """The post does not exist or can't be seen (deleted, private, login required)."""
+
+
+class ScrapperExecutor:
+    """
+    Bounded thread pool for blocking scrapper calls.
+
+    Scrapping runs on its own threads instead of the event loop's default
+    executor, so at most `max_workers` upstream fetches run at once and
+    slow Instagram responses can't take the threads other endpoints use.
+    A timed-out call stops being awaited but keeps its thread until the
+    blocking call returns, so the limit holds even when calls time out.
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_CONCURRENCY):
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scrapper")
+        self._lock = threading.Lock()
+
+        self.submitted = 0
+        self.running = 0
+        self.timeouts = 0
+        self.errors = 0
+
+    def submit(self, fn, *args):
+        """Submit `fn(*args)`, returning a `concurrent.futures.Future`."""
+        def call():
+            with self._lock:
+                self.running += 1
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self.running -= 1
+
+        with self._lock:
+            self.submitted += 1
+        return self._executor.submit(call)
+
+    async def run(self, fn, *args, timeout: Optional[float] = None, on_done=None):
+        """
+        Run `fn(*args)` on the executor and await it for at most `timeout` seconds.
+
+        A call still queued when it times out (or is cancelled) never runs.
+        `on_done` is called from the executor thread once the call has
+        actually finished or been dropped, which may be after this returns.
+        """
+        submitted = self.submit(fn, *args)
+        if on_done is not None:
+            submitted.add_done_callback(lambda _: on_done())
+        future = asyncio.wrap_future(submitted)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            name = getattr(fn, "__qualname__", repr(fn))
+            raise ScrapperTimeout(f"{name} did not finish within {timeout:.2f}s") from None
+        except Exception:
+            self.errors += 1
+            raise
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            running = self.running
+            submitted = self.submitted
+        return {
+            "max_workers": self.max_workers,
+            "running": running,
+            "queued": self._executor._work_queue.qsize(),
+            "submitted": submitted,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+        }
+
+
+_executor: Optional[ScrapperExecutor] = None
+
+
+def configure_executor(max_workers: int) -> ScrapperExecutor:
+    """Replace the shared scrapper executor with one running at most `max_workers` calls at once."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown()
+    _executor = ScrapperExecutor(max_workers=max_workers)
+    return _executor
+
+
+def get_executor() -> ScrapperExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ScrapperExecutor()
+    return _executor
+
+
+def shutdown_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown()
+        _executor = None
+
 
 class BaseScrapper(ABC):
-    
+
+    # default timeout in seconds for the async facade (None waits forever)
+    timeout: Optional[float] = None
+
     @abstractmethod
     def login(self) -> None:
-        pass   
-    
+        pass
+
     @abstractmethod
     def get_post_from_url(self, post_url: str):
         pass
-    
+
     @abstractmethod
     def get_comments_from_post_url(self, post_url: str):
         pass
-    
+
     @abstractmethod
     def get_caption_from_post_url(self, post_url: str):
         pass
-    
-    
-__all__ = ['BaseScrapper']
\ No newline at end of file
+
+    async def run_async(self, method: str, *args, timeout: Optional[float] = None, on_done=None):
+        """
+        Run a blocking scrapper method on the shared scrapper executor.
+
+        `on_done` is passed to `ScrapperExecutor.run`: it is called once the
+        method has actually returned, even if this timed out first.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        return await get_executor().run(getattr(self, method), *args, timeout=timeout, on_done=on_done)
+
+    async def aget_post_from_url(self, post_url: str, timeout: Optional[float] = None):
+        return await self.run_async("get_post_from_url", post_url, timeout=timeout)
+
+    async def aget_comments_from_post_url(self, post_url: str, timeout: Optional[float] = None):
+        return await self.run_async("get_comments_from_post_url", post_url, timeout=timeout)
+
+    async def aget_caption_from_post_url(self, post_url: str, timeout: Optional[float] = None):
+        return await self.run_async("get_caption_from_post_url", post_url, timeout=timeout)
+
+
+__all__ = ['BaseScrapper', 'ScrapperExecutor', 'ScrapperTimeout', 'PostUnavailable', 'configure_executor', 'get_executor', 'shutdown_executor']
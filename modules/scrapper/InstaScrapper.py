@@ -2,7 +2,17 @@ import instaloader
 import argparse
 from base64 import b64encode, b64decode
 from urllib.parse import urlparse
-from .BaseScrapper import BaseScrapper
+from .BaseScrapper import BaseScrapper, PostUnavailable
+from utils.validations import classify_post_url
+
+# what instaloader raises for deleted, private or login-only posts
+# (BadResponseException is "Fetching Post metadata failed" for a missing post)
+UNAVAILABLE_ERRORS = (
+    instaloader.exceptions.QueryReturnedNotFoundException,
+    instaloader.exceptions.BadResponseException,
+    instaloader.exceptions.PrivateProfileNotFollowedException,
+    instaloader.exceptions.LoginRequiredException,
+)
 
 class InstaScrapper(BaseScrapper):
     
@@ -21,6 +31,16 @@ class InstaScrapper(BaseScrapper):
         
     def login(self, username, password):
         self.instaloader.login(username, password)
+
+    def load_session(self, username: str, session: dict):
+        """Reuse the cookies of an existing session instead of logging in again."""
+        self.instaloader.load_session(username, session)
+
+    def load_session_from_file(self, username: str, session_file: str):
+        self.instaloader.load_session_from_file(username, session_file)
+
+    def save_session(self) -> dict:
+        return self.instaloader.save_session()
             
     def get_post_from_url(self, post_url: str) -> instaloader.Post:
         shortcode = self.get_shortcode_from_url(post_url)
@@ -30,19 +50,20 @@ class InstaScrapper(BaseScrapper):
         return post
             
     def get_shortcode_from_url(self, url: str) -> str:
-        path = urlparse(url).path
-        parts = [p for p in path.split("/") if p]
-        # typical: /p/<shortcode>/
-        if len(parts) >= 2 and parts[0] in ("p", "reel", "tv"):
-            return parts[1]
-        return parts[-1] if parts else ""
+        return get_shortcode_from_url(url)
     
     def get_caption_from_post_url(self, post_url: str, username=None, password=None):
 
         shortcode = self.get_shortcode_from_url(post_url)
         if not shortcode:
             raise ValueError("Could not parse shortcode from URL")
-        post = instaloader.Post.from_shortcode(self.instaloader.context, shortcode)
+        return self.get_caption_from_shortcode(shortcode)
+
+    def get_caption_from_shortcode(self, shortcode: str):
+        try:
+            post = instaloader.Post.from_shortcode(self.instaloader.context, shortcode)
+        except UNAVAILABLE_ERRORS as e:
+            raise PostUnavailable(f"Post {shortcode} is unavailable: {e}") from e
         return post.caption
 
     def comments_from_post_url(self, post_url: str):
@@ -70,6 +91,11 @@ class InstaScrapper(BaseScrapper):
         pass
 
 def get_shortcode_from_url(url: str) -> str:
+    # validated URLs are classified (and cached) by utils.validations already
+    post_url, _ = classify_post_url(url, platform="instagram")
+    if post_url is not None:
+        return post_url.shortcode
+
     path = urlparse(url).path
     parts = [p for p in path.split("/") if p]
     # typical: /p/<shortcode>/
@@ -0,0 +1,168 @@
+import time
+import asyncio
+import logging
+from typing import List, Optional
+from .InstaScrapper import InstaScrapper
+from .BaseScrapper import PostUnavailable, ScrapperTimeout, get_executor
+from utils.cache import CachedCaption, CaptionCache, SingleFlight
+
+
+logger = logging.getLogger(__name__)
+
+
+class ScrapperPool:
+    """
+    A fixed set of long-lived `InstaScrapper` instances.
+
+    Each instance keeps its instaloader HTTP session (and its keep-alive
+    connections) for the lifetime of the server, so requests don't pay for
+    connection setup and session bootstrap every time. Instances are not
+    thread-safe, so callers check one out, use it from one thread and check
+    it back in, the same way `WorkerPool` hands out workers.
+    """
+
+    def __init__(self, size: int = 2, timeout: Optional[float] = None, cache: Optional[CaptionCache] = None):
+        self.size = size
+        self.timeout = timeout
+        self.cache = cache
+        # concurrent fetches of the same shortcode share one upstream call
+        self.singleflight = SingleFlight()
+        self.scrappers: List[InstaScrapper] = []
+        self.available: asyncio.Queue = asyncio.Queue()
+        self.logged_in = False
+
+        self.checkouts = 0
+        self.acquire_timeouts = 0
+        self._waiting = 0
+        self._busy_since = {}
+        self._busy_seconds = 0.0
+        self._started_at = time.monotonic()
+
+    async def initialize(self, username: Optional[str] = None, password: Optional[str] = None, session_file: Optional[str] = None):
+        """
+        Create the instances. With credentials, log in (or load `session_file`) once
+        and share that session's cookies with every instance.
+        """
+        session = None
+        if username and (session_file or password):
+            first = await asyncio.to_thread(InstaScrapper)
+            try:
+                if session_file:
+                    await asyncio.to_thread(first.load_session_from_file, username, session_file)
+                else:
+                    await asyncio.to_thread(first.login, username, password)
+            except Exception:
+                logger.exception(f"Instagram login as {username} failed, scrapping anonymously")
+            else:
+                session = first.save_session()
+                self.logged_in = True
+                self.scrappers.append(first)
+
+        while len(self.scrappers) < self.size:
+            scrapper = await asyncio.to_thread(InstaScrapper)
+            if session is not None:
+                scrapper.load_session(username, session)
+            self.scrappers.append(scrapper)
+
+        for scrapper in self.scrappers:
+            # the instance's own async facade (`aget_*`) uses the pool's timeout too
+            scrapper.timeout = self.timeout
+            await self.available.put(scrapper)
+
+        self._started_at = time.monotonic()
+        logger.info(f"Scrapper pool ready with {self.size} instance(s) ({'logged in' if self.logged_in else 'anonymous'})")
+
+    async def acquire(self) -> InstaScrapper:
+        self._waiting += 1
+        try:
+            scrapper = await self.available.get()
+        finally:
+            self._waiting -= 1
+
+        self.checkouts += 1
+        self._busy_since[id(scrapper)] = time.monotonic()
+        return scrapper
+
+    def release(self, scrapper: InstaScrapper):
+        started = self._busy_since.pop(id(scrapper), None)
+        if started is not None:
+            self._busy_seconds += time.monotonic() - started
+        self.available.put_nowait(scrapper)
+
+    async def run(self, method: str, *args, timeout: Optional[float] = None):
+        """
+        Run an `InstaScrapper` method on a checked-out instance, through its `run_async`.
+
+        `timeout` (default: the pool's) covers waiting for an instance as well
+        as the call itself. The instance is checked back in when the call
+        finishes, even if the caller timed out or was cancelled first: the
+        thread can't be interrupted, so the instance stays out of the pool
+        until it is no longer in use.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+
+        try:
+            scrapper = await asyncio.wait_for(self.acquire(), timeout)
+        except asyncio.TimeoutError:
+            self.acquire_timeouts += 1
+            raise ScrapperTimeout(f"No scrapper became available within {timeout:.2f}s") from None
+
+        def release():
+            try:
+                loop.call_soon_threadsafe(self.release, scrapper)
+            except RuntimeError:
+                pass  # the loop already closed during shutdown
+
+        remaining = None if deadline is None else max(deadline - loop.time(), 0)
+        return await scrapper.run_async(method, *args, timeout=remaining, on_done=release)
+
+    async def get_caption(self, shortcode: str, timeout: Optional[float] = None) -> Optional[str]:
+        """
+        Caption of the post `shortcode`, served from the caption cache when possible.
+
+        Concurrent misses for the same shortcode share one upstream fetch and
+        its result or error. Raises `PostUnavailable` for deleted or private
+        posts, which are cached as well. Timeouts and other errors are not cached.
+        """
+        entry = await self.cache.get(shortcode) if self.cache is not None else None
+        if entry is None:
+            entry = await self.singleflight.do(shortcode, lambda: self._fetch_caption(shortcode, timeout))
+
+        if entry.unavailable:
+            raise PostUnavailable(entry.reason)
+        return entry.caption
+
+    async def _fetch_caption(self, shortcode: str, timeout: Optional[float]) -> CachedCaption:
+        try:
+            caption = await self.run("get_caption_from_shortcode", shortcode, timeout=timeout)
+        except PostUnavailable as e:
+            if self.cache is None:
+                raise
+            return await self.cache.set_unavailable(shortcode, str(e))
+
+        if self.cache is None:
+            return CachedCaption(caption, fetched_at=time.time())
+        return await self.cache.set_caption(shortcode, caption)
+
+    def stats(self) -> dict:
+        in_use = self.size - self.available.qsize()
+        now = time.monotonic()
+        busy = self._busy_seconds + sum(now - started for started in self._busy_since.values())
+        uptime = (now - self._started_at) * self.size
+        return {
+            "size": self.size,
+            "available": self.available.qsize(),
+            "in_use": in_use,
+            "waiting": self._waiting,
+            "checkouts": self.checkouts,
+            "acquire_timeouts": self.acquire_timeouts,
+            "logged_in": self.logged_in,
+            "utilization": round((busy / uptime) * 100, 2) if uptime else 0,
+            "executor": get_executor().stats(),
+            "coalescing": self.singleflight.stats(),
+        }
+
+
+__all__ = ['ScrapperPool']
@@ -2,14 +2,19 @@
 import os
 import logging
 import asyncio
+import dataclasses
+from typing import Optional
+from pydantic import BaseModel
 from utils.functions import humanize_time
 from datetime import datetime, timezone, timedelta
-from fastapi import APIRouter, Request
+from fastapi import APIRouter, Request, HTTPException
 from fastapi.routing import APIRoute
 from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
 from collections import deque
 from utils.healthChecker import healthChecker
+from utils.backends import BACKENDS, check_backend_requirements
+from utils.device import PRECISIONS
 
 logger = logging.getLogger(__name__)
 
@@ -101,13 +106,83 @@ def health(request: Request):
 @router.get("/workers")
 def workers(request: Request):
     worker_pool = getattr(request.app.state, 'worker_pool', None)
+    scrapper_pool = getattr(request.app.state, 'scrapper_pool', None)
     return {
         "status": "ok",
-        "ready": worker_pool is not None and len(worker_pool.workers) > 0,
+        "ready": worker_pool is not None and worker_pool.ready,
         "num_gpus": worker_pool.num_gpus if worker_pool else 0,
-        "available_workers": worker_pool.available_workers.qsize() if worker_pool else 0
+        "model_name": worker_pool.config.model_name if worker_pool and worker_pool.config else None,
+        "generation": worker_pool.generation if worker_pool else 0,
+        "draining_workers": len(worker_pool.draining) if worker_pool else 0,
+        "swap_in_progress": worker_pool.swap_in_progress if worker_pool else False,
+        "swaps": worker_pool.swaps[-5:] if worker_pool else [],
+        "mode": worker_pool.mode if worker_pool else None,
+        "cpu_plan": worker_pool.cpu_plan.to_dict() if worker_pool and worker_pool.cpu_plan else None,
+        "backend": worker_pool.backend if worker_pool else None,
+        "quantization": worker_pool.quantization if worker_pool else None,
+        "precision": worker_pool.precision if worker_pool else None,
+        "startup_timings": worker_pool.startup_timings if worker_pool else {},
+        "num_workers": len(worker_pool.workers) if worker_pool else 0,
+        "available_workers": worker_pool.available_workers.qsize() if worker_pool else 0,
+        "queue": worker_pool.queue_stats() if worker_pool else {},
+        "batching": worker_pool.batching_stats() if worker_pool else {},
+        "telemetry": worker_pool.telemetry.get_stats() if worker_pool else {},
+        "scrappers": scrapper_pool.stats() if scrapper_pool else {},
     }
 
+class ModelSwapInput(BaseModel):
+    # any field left out keeps the currently served value
+    model_name: Optional[str] = None
+    backend: Optional[str] = None
+    quantize_int8: Optional[bool] = None
+    precision: Optional[str] = None
+    compile_model: Optional[bool] = None
+
+@router.post("/model/swap")
+async def swap_model(request: Request, body: ModelSwapInput):
+    """Load, warm up and switch to a new model without restarting or dropping capacity."""
+    worker_pool = request.app.state.worker_pool
+    if worker_pool.swap_in_progress:
+        raise HTTPException(status_code=409, detail="A model swap is already in progress")
+    if body.backend is not None and body.backend not in BACKENDS:
+        raise HTTPException(status_code=400, detail=f"Unsupported backend: {body.backend}. Must be one of: {', '.join(BACKENDS)}")
+    if body.backend is not None:
+        try:
+            check_backend_requirements(body.backend)
+        except ImportError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    if body.precision is not None and body.precision not in PRECISIONS:
+        raise HTTPException(status_code=400, detail=f"Unsupported precision: {body.precision}. Must be one of: {', '.join(PRECISIONS)}")
+
+    overrides = {name: value for name, value in body.model_dump().items() if value is not None}
+    config = dataclasses.replace(worker_pool.config, **overrides)
+
+    try:
+        swap = await worker_pool.swap_model(config)
+    except Exception as e:
+        logger.exception(f"Model swap to {config.model_name} failed, still serving {worker_pool.config.model_name}")
+        raise HTTPException(status_code=500, detail=f"Model swap failed: {e}")
+
+    return {"status": "ok", **swap}
+
+@router.delete("/cache/captions")
+async def purge_caption_cache(request: Request, shortcode: Optional[str] = None, unavailable_only: bool = False, expired_only: bool = False):
+    """
+    Purge cached Instagram captions from memory and disk.
+
+    Query params:
+        shortcode: Only purge this post
+        unavailable_only: Only purge posts cached as deleted or private
+        expired_only: Only purge stored entries past their TTL
+    """
+    cache = request.app.state.scrapper_pool.cache
+    if cache is None:
+        raise HTTPException(status_code=404, detail="The caption cache is disabled")
+
+    purged = await cache.purge(shortcode=shortcode, unavailable_only=unavailable_only, expired_only=expired_only)
+    logger.info(f"Purged {purged} cached caption(s)")
+    return {"status": "ok", "purged": purged, "stats": cache.stats()}
+
 # Startup event handler - add this to your main FastAPI app
 async def start_health_checker(app):
     """Call this from your FastAPI app's startup event."""
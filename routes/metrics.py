@@ -29,14 +29,18 @@ async def get_stats(request: Request, endpoint: str = None):
     
     if endpoint:
         stats = tracker.get_stats(endpoint)
-        if not stats or stats.get("count", 0) == 0:
+        if not stats or (stats.get("count", 0) == 0 and stats.get("cancelled", 0) == 0):
             raise HTTPException(status_code=404, detail=f"No data found for endpoint: {endpoint}")
         return stats
     
     stats = tracker.get_stats()
     return {
         "total_endpoints": len(stats),
-        "endpoints": stats
+        "endpoints": stats,
+        "event_loop": request.app.state.loop_monitor.get_stats(),
+        "sentiment_cache": request.app.state.worker_pool.cache.stats(),
+        "caption_cache": request.app.state.scrapper_pool.cache.stats(),
+        "caption_fetches": request.app.state.scrapper_pool.singleflight.stats(),
     }
 
 
@@ -98,6 +102,9 @@ async def get_dashboard(request: Request):
             "total_requests": total_requests,
             "overall_avg_ms": overall_avg_ms,
             "overall_success_rate": overall_success_rate,
+            "event_loop": request.app.state.loop_monitor.get_stats(),
+            "sentiment_cache": request.app.state.worker_pool.cache.stats(),
+            "inference": request.app.state.worker_pool.telemetry.get_stats(),
             "current_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
         }
     )
@@ -1,13 +1,15 @@
 import os
-import torch
+import time
+import asyncio
 import logging
+from typing import List
 from urllib.parse import urlparse
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from fastapi import APIRouter, Request, HTTPException
 from fastapi.responses import HTMLResponse
-from modules.scrapper.InstaScrapper import InstaScrapper
 from modules.LLM.Groq import GroqClient
-from utils.validations import validate_caption_for_sentiment, validate_post_url
+from modules.scrapper.BaseScrapper import PostUnavailable, ScrapperTimeout
+from utils.validations import validate_caption_for_sentiment, validate_captions_for_sentiment, validate_caption_for_long_sentiment, classify_post_url
 
 
 logger = logging.getLogger(__name__)
@@ -16,6 +18,11 @@ router = APIRouter(prefix="/service", tags=["service"])
 
 class PostInput(BaseModel):
     text: str
+    # score long texts as overlapping windows instead of truncating them
+    chunked: bool = False
+    
+class BatchPostInput(BaseModel):
+    texts: List[str] = Field(..., min_length=1, max_length=1000)
     
 class CaptionInput(BaseModel):
     url: str
@@ -28,6 +35,33 @@ class OptimizeInput(BaseModel):
 def validate_request(request):
     pass
 
+
+async def run_until_disconnect(request: Request, awaitable, poll_interval: float = 0.25):
+    """
+    Await `awaitable`, cancelling it if the HTTP client disconnects first.
+
+    Cancelling pulls a request that is still queued for a worker (or waiting
+    in a batch that hasn't run) out of the queue, so abandoned requests don't
+    cost a forward pass. The cancellation is counted in the response tracker.
+    """
+    task = asyncio.ensure_future(awaitable)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=poll_interval)
+            if done:
+                return task.result()
+
+            if await request.is_disconnected():
+                task.cancel()
+                endpoint = f"{request.method} {request.url.path}"
+                request.app.state.response_tracker.record_cancellation(endpoint)
+                logger.info(f"Client disconnected, cancelled {endpoint}")
+                # 499: client closed request, nobody will read this response
+                raise HTTPException(status_code=499, detail="Client disconnected")
+    except asyncio.CancelledError:
+        task.cancel()
+        raise
+
 @router.post(
     "/caption/instagram",
     name="caption_instagram", 
@@ -37,15 +71,24 @@ async def get_instagram_caption(request: Request, postInput: CaptionInput):
     logger.debug(f"Received Instagram URL: {postInput.url}")
     
     # Validate Instagram post URL
-    is_valid, error_msg = validate_post_url(postInput.url, platform="instagram")
-    if not is_valid:
+    post_url, error_msg = classify_post_url(postInput.url, platform="instagram")
+    if post_url is None:
         raise HTTPException(status_code=400, detail=f"Invalid URL: {error_msg}")
     
     try:
-        scrapper = InstaScrapper()
-        caption = scrapper.get_caption_from_post_url(postInput.url)
-    except Exception as e:   # replace with real exception(s)
-        logger.exception("Error fetching caption", e)
+        scrapper_pool = request.app.state.scrapper_pool
+        caption = await run_until_disconnect(
+            request, scrapper_pool.get_caption(post_url.shortcode)
+        )
+    except HTTPException:
+        raise
+    except PostUnavailable as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ScrapperTimeout as e:
+        logger.warning(f"Timed out fetching caption for {post_url.shortcode}: {e}")
+        raise HTTPException(status_code=504, detail="Timed out fetching caption")
+    except Exception:   # replace with real exception(s)
+        logger.exception("Error fetching caption")
         raise HTTPException(status_code=502, detail="Failed to fetch caption")
     return {"caption": caption}
 
@@ -68,8 +111,11 @@ async def optimize_caption(request: Request, postInput: OptimizeInput):
             detail=f"Invalid sentiment. Must be one of: {', '.join(valid_sentiments)}"
         )
     
+    caption = await run_until_disconnect(
+        request, asyncio.to_thread(llmclient.optimizeCaption, postInput.sentiment, postInput.caption)
+    )
     return {
-        "caption": llmclient.optimizeCaption(postInput.sentiment, postInput.caption)
+        "caption": caption
     }
     
 
@@ -81,42 +127,58 @@ async def optimize_caption(request: Request, postInput: OptimizeInput):
 async def classify_sentiment(request: Request, post: PostInput):
 
     logger.debug(post)
+    worker_pool = request.app.state.worker_pool
 
     # Validate text/caption
-    is_valid, error_msg = validate_caption_for_sentiment(post.text)
+    start = time.perf_counter()
+    validate = validate_caption_for_long_sentiment if post.chunked else validate_caption_for_sentiment
+    is_valid, error_msg = validate(post.text)
+    worker_pool.telemetry.record_stage("validate", (time.perf_counter() - start) * 1000)
     if not is_valid:
         raise HTTPException(status_code=400, detail=f"Invalid text: {error_msg}")
     
     text = post.text.strip()
-    worker_pool = request.app.state.worker_pool
-    
-    worker = await worker_pool.acquire_worker()
-
-    try:
-        tokenizer = worker.tokenizer
-        model = worker.model
-
-        # Tokenize and encode
-        inputs = tokenizer(text, return_tensors="pt", truncation=True)
 
-        with torch.no_grad():
-            outputs = model(**inputs)
-            probs = torch.softmax(outputs.logits, dim=-1).squeeze().tolist()
+    if post.chunked:
+        result = {"input_text": text, **await run_until_disconnect(request, worker_pool.classify_long(text))}
+    else:
+        # batched with other concurrent requests by the pool's scheduler
+        result = {"input_text": text, **await run_until_disconnect(request, worker_pool.classify(text))}
 
-        max_idx = int(torch.argmax(torch.tensor(probs)))
-        sentiment = model.config.id2label[max_idx]
-        confidence = round(probs[max_idx], 4)
+    logger.info(f"Sentiment classified: {result}")
 
-        result = {
-            "input_text": text,
-            "predicted_label": sentiment,
-            "confidence": confidence,
-            "all_scores": {model.config.id2label[i]: round(p, 4) for i, p in enumerate(probs)},
-        }
+    return result
 
-        logger.info(f"Sentiment classified: {result}")
 
-    finally:
-        await worker_pool.release_worker(worker)
+@router.post(
+    "/sentiment/batch",
+    name="sentiment_batch",
+    summary="Classify sentiment of many social media posts in one call"
+)
+async def classify_sentiment_batch(request: Request, batch: BatchPostInput):
+
+    # Validate each text on its own, invalid items are reported but don't fail the batch
+    results = [None] * len(batch.texts)
+    valid_indices, valid_texts = [], []
+    validations = validate_captions_for_sentiment(batch.texts)
+    for i, (raw, (is_valid, error_msg)) in enumerate(zip(batch.texts, validations)):
+        if not is_valid:
+            results[i] = {"index": i, "input_text": raw, "error": f"Invalid text: {error_msg}"}
+            continue
+        valid_indices.append(i)
+        valid_texts.append(raw.strip())
+
+    if valid_texts:
+        worker_pool = request.app.state.worker_pool
+        classified = await run_until_disconnect(request, worker_pool.classify_batch(valid_texts))
+        for i, text, result in zip(valid_indices, valid_texts, classified):
+            results[i] = {"index": i, "input_text": text, **result}
+
+    errors = len(batch.texts) - len(valid_texts)
+    logger.info(f"Batch sentiment classified: {len(valid_texts)} ok, {errors} invalid")
 
-    return result
\ No newline at end of file
+    return {
+        "count": len(results),
+        "errors": errors,
+        "results": results,
+    }
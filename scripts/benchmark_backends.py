@@ -0,0 +1,51 @@
+"""
+Compare inference backends for the sentiment model: logit parity against
+eager PyTorch and CPU latency at a few batch sizes.
+"""
+import os
+import argparse
+import torch
+from transformers import AutoTokenizer
+from utils.backends import BACKENDS, load_model, load_sample_texts, compare_models, measure_latency
+from utils.config import Config
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark sentiment inference backends on CPU')
+    parser.add_argument('--backends', nargs='+', default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument('--batch-sizes', nargs='+', type=int, default=[1, 8, 32])
+    parser.add_argument('--iterations', type=int, default=10)
+    parser.add_argument('--threads', type=int, default=0, help='torch intra-op threads (default: torch default)')
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    config = Config()
+    local_model_path = os.path.join(config.model_dir, config.model_name.replace('/', '_'))
+    tokenizer = AutoTokenizer.from_pretrained(local_model_path)
+    texts = load_sample_texts()
+
+    reference = load_model("torch", local_model_path).eval()
+
+    print("=" * 80)
+    print(f"BACKEND COMPARISON ({len(texts)} sample texts, {torch.get_num_threads()} threads)")
+    print("=" * 80)
+
+    for backend in args.backends:
+        model = reference if backend == "torch" else load_model(backend, local_model_path).eval()
+        parity = compare_models(reference, model, tokenizer, texts)
+
+        print(f"\n{backend}")
+        print("-" * 80)
+        print(f"  max |logit diff|: {parity['max_abs_diff']}   label agreement: {parity['label_agreement']}%")
+        for batch_size in args.batch_sizes:
+            latency = measure_latency(model, tokenizer, texts, batch_size=batch_size, iterations=args.iterations)
+            print(
+                f"  batch {batch_size:>3}: avg {latency['avg_ms']:>8.2f}ms  p50 {latency['p50_ms']:>8.2f}ms  "
+                f"p95 {latency['p95_ms']:>8.2f}ms  {latency['texts_per_second']:>8.1f} texts/s"
+            )
+
+
+if __name__ == "__main__":
+    main()
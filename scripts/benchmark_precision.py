@@ -0,0 +1,57 @@
+"""
+Compare bf16 against fp32 for the sentiment model on CPU: label agreement
+and confidence drift on a sample corpus, and latency at a few batch sizes.
+"""
+import os
+import copy
+import argparse
+import torch
+from transformers import AutoTokenizer
+from utils.backends import load_model, load_sample_texts, compare_models, measure_latency
+from utils.config import Config
+from utils.device import cpu_supports_bf16
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark bf16 vs fp32 sentiment inference on CPU')
+    parser.add_argument('--corpus', default=None, help='text file with one caption per line (default: bundled samples)')
+    parser.add_argument('--batch-sizes', nargs='+', type=int, default=[1, 8, 32])
+    parser.add_argument('--iterations', type=int, default=10)
+    parser.add_argument('--threads', type=int, default=0, help='torch intra-op threads (default: torch default)')
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    config = Config()
+    local_model_path = os.path.join(config.model_dir, config.model_name.replace('/', '_'))
+    tokenizer = AutoTokenizer.from_pretrained(local_model_path)
+    texts = load_sample_texts(args.corpus) if args.corpus else load_sample_texts()
+
+    fp32 = load_model("torch", local_model_path).eval()
+    bf16 = copy.deepcopy(fp32).to(torch.bfloat16)
+
+    print("=" * 80)
+    print(f"PRECISION COMPARISON ({len(texts)} texts, {torch.get_num_threads()} threads, native cpu bf16: {cpu_supports_bf16()})")
+    print("=" * 80)
+
+    agreement = compare_models(fp32, bf16, tokenizer, texts)
+    print(
+        f"\nbf16 vs fp32: label agreement {agreement['label_agreement']}%   "
+        f"max confidence delta {agreement['max_confidence_delta']}   "
+        f"mean confidence delta {agreement['mean_confidence_delta']}"
+    )
+
+    for name, model in (("fp32", fp32), ("bf16", bf16)):
+        print(f"\n{name}")
+        print("-" * 80)
+        for batch_size in args.batch_sizes:
+            latency = measure_latency(model, tokenizer, texts, batch_size=batch_size, iterations=args.iterations)
+            print(
+                f"  batch {batch_size:>3}: avg {latency['avg_ms']:>8.2f}ms  p50 {latency['p50_ms']:>8.2f}ms  "
+                f"p95 {latency['p95_ms']:>8.2f}ms  {latency['texts_per_second']:>8.1f} texts/s"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Test script for WorkerPool admission control: a full queue rejects new
+requests right away, queued requests that can't start before their deadline
+are shed, and shed requests become a 503 with Retry-After.
+
+Runs against fake workers, no model is loaded.
+"""
+import os
+import sys
+import time
+import asyncio
+
+os.environ.setdefault("GROQ_API_KEY", "test")
+
+from fastapi.testclient import TestClient
+from utils.worker import WorkerPool, BatchScheduler, PoolOverloaded
+
+
+class FakeWorker:
+    """Answers every batch after `delay` seconds."""
+
+    def __init__(self, gpu_id: int, delay: float):
+        self.gpu_id = gpu_id
+        self.generation = 0
+        self.delay = delay
+        self.texts = []
+
+    async def run(self, method, texts, *args):
+        texts = texts if isinstance(texts, list) else [texts]
+        self.texts.extend(texts)
+        await asyncio.sleep(self.delay)
+        timings = {"tokenize_ms": 0.0, "forward_ms": 0.0, "postprocess_ms": 0.0, "forwards": []}
+        return [{"text": text} for text in texts], timings
+
+    def close(self):
+        pass
+
+
+async def make_pool(delay: float, max_queue_depth: int = 64, deadline_s: float = 5.0):
+    pool = WorkerPool(num_gpus=1)
+    worker = FakeWorker(0, delay)
+    pool.workers.append(worker)
+    await pool.available_workers.put(worker)
+    pool.max_queue_depth = max_queue_depth
+    pool.request_deadline_s = deadline_s
+    pool.retry_after_s = 3
+    pool.scheduler = BatchScheduler(pool, max_batch_size=1, max_wait_ms=0)
+    pool.scheduler.start()
+    return pool, worker
+
+
+def check(passed, description):
+    print(f"{'✓ PASS' if passed else '✗ FAIL'} - {description}")
+    return passed
+
+
+async def test_queue_full():
+    pool, worker = await make_pool(delay=0.2, max_queue_depth=2)
+    running = asyncio.create_task(pool.scheduler.submit("running"))
+    await asyncio.sleep(0.02)
+    queued = [asyncio.create_task(pool.scheduler.submit(f"queued {i}")) for i in range(2)]
+    await asyncio.sleep(0.02)
+
+    start = time.perf_counter()
+    try:
+        await pool.scheduler.submit("rejected")
+        rejected = None
+    except PoolOverloaded as e:
+        rejected = e
+    rejected_ms = (time.perf_counter() - start) * 1000
+
+    await asyncio.gather(running, *queued)
+    await pool.scheduler.stop()
+    return [
+        check(rejected is not None, "Request over max_queue_depth is rejected"),
+        check(rejected_ms < 10, f"Rejection is immediate ({rejected_ms:.2f}ms)"),
+        check(rejected is not None and rejected.retry_after == 3, "Rejection carries the Retry-After hint"),
+        check(pool.rejected == 1 and "rejected" not in worker.texts, f"Rejected request never ran (rejected={pool.rejected})"),
+    ]
+
+
+async def test_deadline():
+    pool, worker = await make_pool(delay=0.3, deadline_s=0.1)
+    running = asyncio.create_task(pool.scheduler.submit("running"))
+    await asyncio.sleep(0.02)
+    try:
+        await pool.scheduler.submit("late")
+        shed = False
+    except PoolOverloaded:
+        shed = True
+
+    # the direct path (batch and long-text requests) has the same deadline
+    try:
+        await asyncio.gather(running, pool._run_on_worker("classify", ["direct 1"]), pool._run_on_worker("classify", ["direct 2"]))
+        direct_shed = False
+    except PoolOverloaded:
+        direct_shed = True
+    await asyncio.sleep(0.4)
+    await pool.scheduler.stop()
+    return [
+        check(shed and "late" not in worker.texts, "Queued request past its deadline is shed and never runs"),
+        check(direct_shed, "Direct request that can't get a worker before its deadline is shed"),
+        # the scheduled request and both direct ones
+        check(pool.expired == 3, f"Expired requests are counted (expired={pool.expired})"),
+    ]
+
+
+def test_http_503():
+    from main import app
+
+    @app.get("/_test/overloaded")
+    async def overloaded():
+        raise PoolOverloaded("Worker queue is full", 7)
+
+    response = TestClient(app).get("/_test/overloaded")
+    return [
+        check(response.status_code == 503, f"Shed request answers 503 ({response.status_code})"),
+        check(response.headers.get("Retry-After") == "7", f"Retry-After header is set ({response.headers.get('Retry-After')})"),
+    ]
+
+
+async def main():
+    print("=" * 60)
+    print("ADMISSION CONTROL TESTS")
+    print("=" * 60)
+    print()
+
+    results = []
+    for test in (test_queue_full, test_deadline, test_http_503):
+        print(f"{test.__name__}:")
+        print("-" * 60)
+        outcome = test()
+        results += await outcome if asyncio.iscoroutine(outcome) else outcome
+        print()
+
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,100 @@
+"""
+Test script for the batch autotuner: each tuning rule moves the batch size
+and wait window in the right direction, and values stay within their bounds.
+
+Feeds synthetic batch observations to a BatchAutotuner in front of a
+stand-in scheduler, no model is loaded.
+"""
+import sys
+from utils.worker import BatchAutotuner
+
+
+class FakePool:
+    def __init__(self):
+        self.depth = 0
+
+    def queue_depth(self):
+        return self.depth
+
+
+class FakeScheduler:
+    def __init__(self, max_batch_size: int = 16, max_wait_ms: float = 8.0):
+        self.pool = FakePool()
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+
+
+def make_tuner(max_batch_size: int = 16, max_wait_ms: float = 8.0):
+    scheduler = FakeScheduler(max_batch_size, max_wait_ms)
+    tuner = BatchAutotuner(
+        scheduler, p95_target_ms=100, min_batch_size=1, max_batch_size=64, min_wait_ms=0, max_wait_ms=20,
+    )
+    return tuner, scheduler
+
+
+def observe(tuner, batch_size: int, latency_ms: float, service_ms: float, count: int = 20):
+    for _ in range(count):
+        tuner.observe(batch_size, latency_ms, service_ms)
+
+
+def check(passed, description):
+    print(f"{'✓ PASS' if passed else '✗ FAIL'} - {description}")
+    return passed
+
+
+def main():
+    print("=" * 60)
+    print("BATCH AUTOTUNER TESTS")
+    print("=" * 60)
+    print()
+    results = []
+
+    tuner, scheduler = make_tuner()
+    observe(tuner, 16, 500, 500, count=BatchAutotuner.MIN_SAMPLES - 1)
+    results.append(check(tuner.adjust() is None and scheduler.max_batch_size == 16, "Too few samples change nothing"))
+
+    tuner, scheduler = make_tuner()
+    observe(tuner, 16, 150, 120)
+    tuner.adjust()
+    results.append(check((scheduler.max_batch_size, scheduler.max_wait_ms) == (12, 4.0), f"Slow batches shrink the batch and halve the wait ({scheduler.max_batch_size}, {scheduler.max_wait_ms})"))
+
+    tuner, scheduler = make_tuner()
+    observe(tuner, 4, 150, 30)
+    tuner.adjust()
+    results.append(check((scheduler.max_batch_size, scheduler.max_wait_ms) == (16, 4.0), f"Queueing latency halves the wait only ({scheduler.max_batch_size}, {scheduler.max_wait_ms})"))
+
+    tuner, scheduler = make_tuner()
+    observe(tuner, 16, 150, 30)
+    tuner.adjust()
+    results.append(check((scheduler.max_batch_size, scheduler.max_wait_ms) == (20, 4.0), f"Latency with full batches grows the batch ({scheduler.max_batch_size}, {scheduler.max_wait_ms})"))
+
+    tuner, scheduler = make_tuner()
+    scheduler.pool.depth = 40
+    observe(tuner, 10, 40, 20)
+    tuner.adjust()
+    results.append(check(scheduler.max_batch_size == 20 and scheduler.max_wait_ms == 8.0, f"Headroom with a backlog grows the batch ({scheduler.max_batch_size})"))
+
+    tuner, scheduler = make_tuner()
+    observe(tuner, 4, 40, 20)
+    tuner.adjust()
+    results.append(check(scheduler.max_wait_ms == 16.0 and scheduler.max_batch_size == 16, f"Under-filled batches widen the wait ({scheduler.max_wait_ms})"))
+
+    tuner, scheduler = make_tuner()
+    observe(tuner, 8, 90, 50)
+    results.append(check(tuner.adjust() is None, "Latency near the target changes nothing"))
+
+    tuner, scheduler = make_tuner(max_batch_size=60, max_wait_ms=16)
+    for _ in range(5):
+        observe(tuner, scheduler.max_batch_size, 40, 20)
+        tuner.adjust()
+    observe(tuner, 4, 40, 20)
+    tuner.adjust()
+    results.append(check(scheduler.max_batch_size == 64 and scheduler.max_wait_ms == 20, f"Values stay within their bounds ({scheduler.max_batch_size}, {scheduler.max_wait_ms})"))
+    results.append(check(len(tuner.decisions) == 2, f"Only real changes are recorded as decisions ({len(tuner.decisions)})"))
+
+    print()
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
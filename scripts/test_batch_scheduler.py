@@ -0,0 +1,127 @@
+"""
+Test script for the batching scheduler: concurrent requests are merged into
+shared batches, the batching window is respected, every caller gets its own
+result, and cancelled requests never reach a worker.
+
+Runs against fake workers, no model is loaded.
+"""
+import sys
+import time
+import asyncio
+from utils.worker import WorkerPool, BatchScheduler
+
+
+class FakeWorker:
+    """Records every batch it is given and answers after `delay` seconds."""
+
+    def __init__(self, gpu_id: int, delay: float = 0.05):
+        self.gpu_id = gpu_id
+        self.generation = 0
+        self.delay = delay
+        self.batches = []
+
+    async def run(self, method, texts, *args):
+        self.batches.append(list(texts))
+        await asyncio.sleep(self.delay)
+        timings = {"tokenize_ms": 0.0, "forward_ms": 0.0, "postprocess_ms": 0.0, "forwards": [(len(texts), 16)]}
+        return [{"text": text} for text in texts], timings
+
+    def close(self):
+        pass
+
+
+async def make_pool(num_workers: int = 1, delay: float = 0.05, max_batch_size: int = 16, max_wait_ms: float = 5.0):
+    pool = WorkerPool(num_gpus=num_workers)
+    workers = [FakeWorker(i, delay) for i in range(num_workers)]
+    for worker in workers:
+        pool.workers.append(worker)
+        await pool.available_workers.put(worker)
+    pool.scheduler = BatchScheduler(pool, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+    pool.scheduler.start()
+    return pool, workers
+
+
+def check(passed, description):
+    print(f"{'✓ PASS' if passed else '✗ FAIL'} - {description}")
+    return passed
+
+
+async def test_merge():
+    pool, (worker,) = await make_pool(max_batch_size=16, max_wait_ms=20)
+    texts = [f"text {i}" for i in range(8)]
+    results = await asyncio.gather(*(pool.scheduler.submit(text) for text in texts))
+    await pool.scheduler.stop()
+    return [
+        check(len(worker.batches) == 1, f"8 concurrent requests ran as one batch ({[len(b) for b in worker.batches]})"),
+        check([r["text"] for r in results] == texts, "Every caller got its own result"),
+    ]
+
+
+async def test_max_batch_size():
+    pool, (worker,) = await make_pool(max_batch_size=4, max_wait_ms=20)
+    texts = [f"text {i}" for i in range(10)]
+    results = await asyncio.gather(*(pool.scheduler.submit(text) for text in texts))
+    await pool.scheduler.stop()
+    sizes = [len(batch) for batch in worker.batches]
+    return [
+        check(max(sizes) <= 4 and sum(sizes) == 10, f"Batches never exceed max_batch_size ({sizes})"),
+        check([r["text"] for r in results] == texts, "Results stay matched to callers across batches"),
+    ]
+
+
+async def test_wait_window():
+    pool, (worker,) = await make_pool(max_batch_size=16, max_wait_ms=50, delay=0)
+    start = time.perf_counter()
+    await pool.scheduler.submit("alone")
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    await asyncio.gather(*(pool.scheduler.submit(f"full {i}") for i in range(16)))
+    full_ms = (time.perf_counter() - start) * 1000
+    await pool.scheduler.stop()
+    return [
+        check(45 <= elapsed_ms < 150, f"A lone request waits for the batching window ({elapsed_ms:.1f}ms)"),
+        check(full_ms < 40, f"A full batch runs without waiting out the window ({full_ms:.1f}ms)"),
+    ]
+
+
+async def test_cancellation():
+    pool, (worker,) = await make_pool(max_batch_size=1, max_wait_ms=0, delay=0.2)
+    busy = asyncio.create_task(pool.scheduler.submit("busy"))
+    await asyncio.sleep(0.05)
+
+    # queued behind the running batch, then abandoned by its caller
+    abandoned = asyncio.create_task(pool.scheduler.submit("abandoned"))
+    await asyncio.sleep(0.05)
+    abandoned.cancel()
+    await asyncio.gather(abandoned, return_exceptions=True)
+
+    await busy
+    await pool.scheduler.submit("after")
+    await pool.scheduler.stop()
+    texts = [text for batch in worker.batches for text in batch]
+    return [
+        check("abandoned" not in texts, f"Cancelled request never reached a worker ({texts})"),
+        check(pool.cancelled == 1, f"Cancellation was counted (cancelled={pool.cancelled})"),
+        check(len(pool.scheduler) == 0, "Cancelled request was removed from the queue"),
+    ]
+
+
+async def main():
+    print("=" * 60)
+    print("BATCH SCHEDULER TESTS")
+    print("=" * 60)
+    print()
+
+    results = []
+    for test in (test_merge, test_max_batch_size, test_wait_window, test_cancellation):
+        print(f"{test.__name__}:")
+        print("-" * 60)
+        results += await test()
+        print()
+
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
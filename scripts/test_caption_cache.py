@@ -0,0 +1,130 @@
+"""
+Test script for the caption cache: captions survive a restart, posts that
+could not be fetched are cached for the shorter negative TTL, and purge
+filters by shortcode, unavailable entries and expired entries.
+
+Uses a SQLite file in a temporary directory.
+"""
+import os
+import sys
+import time
+import asyncio
+import tempfile
+from utils.cache import CachedCaption, CaptionStore, CaptionCache
+
+
+def check(passed, description):
+    print(f"{'✓ PASS' if passed else '✗ FAIL'} - {description}")
+    return passed
+
+
+async def test_persistence(directory: str):
+    path = os.path.join(directory, "nested", "persist.sqlite3")
+    cache = CaptionCache(path)
+    await cache.set_caption("ABCDE", "Great product!")
+    await cache.set_caption("EMPTY", None)
+    cache.close()
+
+    reopened = CaptionCache(path)
+    entry = await reopened.get("ABCDE")
+    empty = await reopened.get("EMPTY")
+    memory_hit = await reopened.get("ABCDE")
+    missing = await reopened.get("MISSING")
+    stats = reopened.stats()
+    reopened.close()
+
+    return [
+        check(entry is not None and entry.caption == "Great product!" and not entry.unavailable, "Captions survive reopening the store"),
+        check(empty is not None and empty.caption is None and not empty.unavailable, "Posts without a caption are cached as such"),
+        check(memory_hit is entry and stats["store_hits"] == 2, f"Store hits are promoted to memory ({stats['store_hits']} store hits)"),
+        check(missing is None and stats["store_misses"] == 1, "Unknown shortcodes miss both tiers"),
+    ]
+
+
+async def test_negative_caching(directory: str):
+    path = os.path.join(directory, "negative.sqlite3")
+    cache = CaptionCache(path, ttl_seconds=60, negative_ttl_seconds=0.2)
+    await cache.set_unavailable("GONE1", "Post not found")
+    await cache.set_caption("LIVE1", "still here")
+
+    cached = await cache.get("GONE1")
+    _, expires_at = cache.store.get("GONE1")
+    await asyncio.sleep(0.25)
+    expired = await cache.get("GONE1")
+    live = await cache.get("LIVE1")
+    cache.close()
+
+    reopened = CaptionCache(path, ttl_seconds=60, negative_ttl_seconds=0.2)
+    reopened_expired = await reopened.get("GONE1")
+    reopened.close()
+
+    return [
+        check(cached is not None and cached.unavailable and cached.reason == "Post not found", "Unavailable posts are cached with their reason"),
+        check(abs(expires_at - cached.fetched_at - 0.2) < 1e-6, f"Negative entries use the negative TTL ({expires_at - cached.fetched_at:.2f}s)"),
+        check(expired is None and live is not None, "Negative entries expire while captions live on"),
+        check(reopened_expired is None, "Expired negative entries are not served after a restart"),
+    ]
+
+
+async def test_purge(directory: str):
+    path = os.path.join(directory, "purge.sqlite3")
+    cache = CaptionCache(path, ttl_seconds=60, negative_ttl_seconds=60)
+    for shortcode in ("KEEP1", "KEEP2", "DROP1"):
+        await cache.set_caption(shortcode, f"caption {shortcode}")
+    for shortcode in ("GONE1", "GONE2"):
+        await cache.set_unavailable(shortcode, "Post not found")
+    # already expired in the store only
+    cache.store.set("OLD01", CachedCaption("old", fetched_at=time.time() - 10), time.time() - 1)
+
+    by_shortcode = await cache.purge(shortcode="DROP1")
+    dropped = await cache.get("DROP1")
+    expired = await cache.purge(expired_only=True)
+    unavailable = await cache.purge(unavailable_only=True)
+    gone = await cache.get("GONE1")
+    remaining = cache.store.count()
+    kept = await cache.get("KEEP1")
+    everything = await cache.purge()
+    empty_memory = await cache.get("KEEP2")
+    cache.close()
+
+    return [
+        check(by_shortcode == 1 and dropped is None, "Purging a shortcode removes it from both tiers"),
+        check(expired == 1, f"expired_only removes only expired rows ({expired})"),
+        check(unavailable == 2 and gone is None, f"unavailable_only removes negative entries from both tiers ({unavailable})"),
+        check(remaining == 2 and kept is not None, f"Other captions are kept ({remaining} left)"),
+        check(everything == 2 and empty_memory is None, "Purging with no filters empties both tiers"),
+    ]
+
+
+def test_store_direct(directory: str):
+    store = CaptionStore(os.path.join(directory, "store.sqlite3"))
+    store.set("ABCDE", CachedCaption("first", fetched_at=1.0), time.time() + 60)
+    store.set("ABCDE", CachedCaption("second", fetched_at=2.0), time.time() + 60)
+    entry, _ = store.get("ABCDE")
+    count = store.count()
+    store.close()
+    return [
+        check(entry.caption == "second" and count == 1, "Setting a shortcode again replaces its row"),
+    ]
+
+
+async def main():
+    print("=" * 60)
+    print("CAPTION CACHE TESTS")
+    print("=" * 60)
+    print()
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for test in (test_persistence, test_negative_caching, test_purge, test_store_direct):
+            print(f"{test.__name__}:")
+            print("-" * 60)
+            outcome = test(directory)
+            results += await outcome if asyncio.iscoroutine(outcome) else outcome
+            print()
+
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,128 @@
+"""
+Test script for the compiled caption validator: CaptionValidator,
+validate_caption and validate_captions give the same verdict and message as
+the original rule-by-rule validator, for the default and custom limits.
+
+The original validator is embedded below as the reference.
+"""
+import re
+import sys
+from utils.validations import (
+    CaptionValidator, get_caption_validator, validate_caption, validate_captions,
+    validate_caption_for_sentiment, validate_captions_for_sentiment,
+)
+
+
+LIMITS = ((500, 1, 200), (20, 5, 3), (5000, 1, 1000), (400, 1, 200))
+
+CAPTIONS = [
+    None, 42, "", "   ", "\n\t", "!", "ok", "This is a great product!", "I love this! 😊",
+    "a" * 500, "a" * 501, "hello" + "o" * 10, "hello" + "o" * 9, "!!!!!!@@@@@######$$$$$%%%%",
+    "😊" * 60, "😊 " * 51, "😊 " * 50, "word " * 201, "a " * 200 + "a", "a " * 199 + "a",
+    "test\x00caption", "test\x01\x02caption", "line one\nline two\r\n\ttabbed",
+    "Buy now! Limited offer!!! #sale @shop", "Check this: https://example.com",
+    "@user1 @user2 @user3 #tag1 #tag2", "Regular text with some 😊😂🔥 emojis",
+    "café naïve résumé", "one two three four", "short",
+]
+
+
+def reference_validate_caption(caption, max_length=500, min_length=1, max_words=200):
+    if caption is None:
+        return False, "Caption cannot be None"
+    if not isinstance(caption, str):
+        return False, "Caption must be a string"
+    if not caption.strip():
+        return False, "Caption cannot be empty or contain only whitespace"
+
+    caption_length = len(caption)
+    if caption_length < min_length:
+        return False, f"Caption must be at least {min_length} character(s)"
+    if caption_length > max_length:
+        return False, f"Caption exceeds maximum length of {max_length} characters"
+
+    if len(re.findall(r'[^a-zA-Z0-9\s]', caption)) / caption_length > 0.5:
+        return False, "Caption contains too many special characters"
+
+    if re.search(r'(.)\1{10,}', caption):
+        return False, "Caption contains excessive character repetition"
+
+    emoji_pattern = re.compile(
+        "[\U0001F600-\U0001F64F"
+        "\U0001F300-\U0001F5FF"
+        "\U0001F680-\U0001F6FF"
+        "\U0001F1E0-\U0001F1FF"
+        "\U00002702-\U000027B0"
+        "\U000024C2-\U0001F251]+",
+        flags=re.UNICODE
+    )
+    if len(emoji_pattern.findall(caption)) > 50:
+        return False, "Caption contains too many emojis"
+
+    if '\x00' in caption:
+        return False, "Caption contains null bytes"
+    if [c for c in caption if ord(c) < 32 and c not in '\n\r\t']:
+        return False, "Caption contains invalid control characters"
+
+    if len(caption.split()) > max_words:
+        return False, f"Caption contains too many words (max {max_words})"
+
+    return True, ""
+
+
+def check(passed, description):
+    print(f"{'✓ PASS' if passed else '✗ FAIL'} - {description}")
+    return passed
+
+
+def test_matches_reference():
+    mismatches = []
+    for limits in LIMITS:
+        validator = CaptionValidator(*limits)
+        for caption in CAPTIONS:
+            expected = reference_validate_caption(caption, *limits)
+            if validator(caption) != expected or validate_caption(caption, *limits) != expected:
+                mismatches.append((limits, caption, expected))
+
+    for limits, caption, expected in mismatches[:5]:
+        print(f"  mismatch: {caption!r} with limits {limits}, expected {expected}")
+    rejected = sum(not reference_validate_caption(c)[0] for c in CAPTIONS)
+    return [
+        check(not mismatches, f"Validator matches the reference ({len(LIMITS)} limit sets, {len(CAPTIONS)} captions, {rejected} rejected at defaults)"),
+        check(validate_caption("a " * 200 + "a")[1] == "Caption contains too many words (max 200)", "Word count still runs just past the skip threshold"),
+    ]
+
+
+def test_batch():
+    return [
+        check(validate_captions(CAPTIONS) == [validate_caption(c) for c in CAPTIONS], "validate_captions matches per-caption results in order"),
+        check(validate_captions(CAPTIONS, 20, 5, 3) == [validate_caption(c, 20, 5, 3) for c in CAPTIONS], "validate_captions applies custom limits"),
+        check(validate_captions_for_sentiment(CAPTIONS) == [validate_caption_for_sentiment(c) for c in CAPTIONS], "validate_captions_for_sentiment matches the single-caption wrapper"),
+        check(validate_captions(iter(["ok", None])) == [(True, ""), (False, "Caption cannot be None")], "Any iterable of captions is accepted"),
+    ]
+
+
+def test_validator_cache():
+    return [
+        check(get_caption_validator(500, 1, 200) is get_caption_validator(500, 1, 200), "Validators are shared per set of limits"),
+        check(get_caption_validator(20, 5, 3) is not get_caption_validator(500, 1, 200), "Different limits get different validators"),
+    ]
+
+
+def main():
+    print("=" * 60)
+    print("CAPTION VALIDATOR TESTS")
+    print("=" * 60)
+    print()
+
+    results = []
+    for test in (test_matches_reference, test_batch, test_validator_cache):
+        print(f"{test.__name__}:")
+        print("-" * 60)
+        results += test()
+        print()
+
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
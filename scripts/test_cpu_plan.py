@@ -0,0 +1,97 @@
+"""
+Test script for the CPU worker planner: worker and thread counts fit the
+usable cores (visible CPUs capped by the cgroup quota), explicit settings
+are honoured, and workers are pinned to disjoint cores node by node only
+when that doesn't oversubscribe them.
+
+The CPU topology is stubbed, so results don't depend on the machine.
+"""
+import sys
+import utils.device
+from utils.device import plan_cpu_workers, _parse_cpulist
+
+
+def plan(cpus: int, limit=None, nodes: int = 1, **kwargs):
+    """Plan for `cpus` visible CPUs under a cgroup quota of `limit` cores, numbered round-robin over `nodes` NUMA nodes."""
+    visible = list(range(cpus))
+    originals = utils.device.visible_cpus, utils.device.cgroup_cpu_limit, utils.device.numa_nodes
+    utils.device.visible_cpus = lambda: visible
+    utils.device.cgroup_cpu_limit = lambda: limit
+    # like many dual-socket machines, sibling CPU numbers alternate between nodes
+    utils.device.numa_nodes = lambda cpus: [visible[node::nodes] for node in range(nodes)]
+    try:
+        return plan_cpu_workers(**kwargs)
+    finally:
+        utils.device.visible_cpus, utils.device.cgroup_cpu_limit, utils.device.numa_nodes = originals
+
+
+def check(passed, description):
+    print(f"{'✓ PASS' if passed else '✗ FAIL'} - {description}")
+    return passed
+
+
+def test_auto():
+    default = plan(32, nodes=2)
+    limited = plan(32, limit=6)
+    fractional = plan(32, limit=2.5)
+    single = plan(2)
+    return [
+        check((default.workers, default.intra_op_threads) == (8, 4), f"32 cores plan 8 workers x 4 threads ({default.workers} x {default.intra_op_threads})"),
+        check((limited.usable_cores, limited.workers, limited.intra_op_threads) == (6, 1, 6), f"The cgroup quota caps usable cores ({limited.usable_cores} usable, {limited.workers} x {limited.intra_op_threads})"),
+        check(fractional.usable_cores == 2, f"A fractional quota rounds down ({fractional.usable_cores})"),
+        check((single.workers, single.intra_op_threads, single.pinning) == (1, 2, None), "A single worker takes every core unpinned"),
+    ]
+
+
+def test_threads_per_worker():
+    eight = plan(32, threads_per_worker=8)
+    too_many = plan(4, threads_per_worker=8)
+    return [
+        check((eight.workers, eight.intra_op_threads) == (4, 8), f"threads_per_worker=8 on 32 cores plans 4 workers ({eight.workers} x {eight.intra_op_threads})"),
+        check(eight.workers * eight.intra_op_threads <= eight.usable_cores, "Planned threads never exceed the usable cores"),
+        check(eight.pinning is not None, "Workers planned from threads_per_worker stay pinned"),
+        check(too_many.workers == 1, f"At least one worker is planned ({too_many.workers})"),
+    ]
+
+
+def test_explicit():
+    both = plan(16, workers=2, threads_per_worker=3)
+    workers_only = plan(16, workers=3)
+    oversubscribed = plan(8, workers=3, threads_per_worker=4)
+    unpinned = plan(16, pin=False)
+    return [
+        check((both.workers, both.intra_op_threads) == (2, 3), "Explicit workers and threads are kept"),
+        check(workers_only.intra_op_threads == 5, f"Explicit workers split the cores evenly ({workers_only.intra_op_threads})"),
+        check(oversubscribed.pinning is None, "Oversubscribed workers are not pinned"),
+        check(unpinned.pinning is None, "pin=False disables pinning"),
+    ]
+
+
+def test_pinning():
+    pinned = plan(16, nodes=2, workers=4, threads_per_worker=4)
+    cores = [cpu for cores in pinned.pinning for cpu in cores]
+    return [
+        check(len(cores) == len(set(cores)) == 16, "Workers are pinned to disjoint cores"),
+        check(pinned.pinning == [[0, 2, 4, 6], [8, 10, 12, 14], [1, 3, 5, 7], [9, 11, 13, 15]], f"Cores are filled node by node ({pinned.pinning})"),
+        check(_parse_cpulist("0-3,8,10-11\n") == [0, 1, 2, 3, 8, 10, 11], "NUMA cpulists are parsed"),
+    ]
+
+
+def main():
+    print("=" * 60)
+    print("CPU WORKER PLAN TESTS")
+    print("=" * 60)
+    print()
+
+    results = []
+    for test in (test_auto, test_threads_per_worker, test_explicit, test_pinning):
+        print(f"{test.__name__}:")
+        print("-" * 60)
+        results += test()
+        print()
+
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
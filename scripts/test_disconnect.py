@@ -0,0 +1,129 @@
+"""
+Test script to check that requests abandoned by the client are cancelled.
+
+Starts a real uvicorn server with the app's middleware stack and the
+service routes (backed by a fake, slow worker pool), opens connections
+that drop before the response is ready, and checks that their work was
+cancelled instead of run. TestClient can't simulate a dropped connection,
+so this has to go over a real socket.
+"""
+import os
+import sys
+import time
+import json
+import socket
+import asyncio
+import threading
+
+os.environ.setdefault("GROQ_API_KEY", "test")
+
+import httpx
+import uvicorn
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+from routes.service import router
+from utils.metrics import InferenceTelemetry, ResponseTimeTracker, ResponseTimeMiddleware
+
+
+ENDPOINT = "POST /service/sentiment/base"
+WORK_SECONDS = 2.0
+
+
+class SlowPool:
+    """Stands in for `WorkerPool`: every classification takes WORK_SECONDS unless cancelled."""
+
+    def __init__(self):
+        self.telemetry = InferenceTelemetry()
+        self.started = 0
+        self.completed = 0
+        self.cancelled = 0
+
+    async def classify(self, text):
+        self.started += 1
+        try:
+            await asyncio.sleep(WORK_SECONDS)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        self.completed += 1
+        return {"label": "positive", "score": 1.0}
+
+
+def build_app(tracker, pool):
+    app = FastAPI()
+    app.include_router(router)
+    app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])
+    app.add_middleware(ResponseTimeMiddleware, tracker=tracker)
+    app.state.response_tracker = tracker
+    app.state.worker_pool = pool
+    return app
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def drop_after(port, seconds):
+    """Send a sentiment request and close the connection before the response arrives."""
+    body = json.dumps({"text": "This is a great product!"}).encode()
+    with socket.create_connection(("127.0.0.1", port)) as s:
+        s.sendall(
+            b"POST /service/sentiment/base HTTP/1.1\r\nHost: test\r\n"
+            b"Content-Type: application/json\r\nContent-Length: " + str(len(body)).encode() + b"\r\n\r\n" + body
+        )
+        time.sleep(seconds)
+
+
+def check(passed, description):
+    print(f"{'✓ PASS' if passed else '✗ FAIL'} - {description}")
+    return passed
+
+
+def main():
+    print("=" * 60)
+    print("CLIENT DISCONNECT CANCELLATION TESTS")
+    print("=" * 60)
+    print()
+
+    tracker, pool = ResponseTimeTracker(), SlowPool()
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(build_app(tracker, pool), host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+
+    try:
+        served = {}
+        def serve_one():
+            served["response"] = httpx.post(f"http://127.0.0.1:{port}/service/sentiment/base", json={"text": "I love this!"}, timeout=10)
+
+        clients = [threading.Thread(target=drop_after, args=(port, 0.3)) for _ in range(3)]
+        clients.append(threading.Thread(target=serve_one))
+        for client in clients:
+            client.start()
+        for client in clients:
+            client.join()
+        # give the server time to poll for the disconnects
+        time.sleep(WORK_SECONDS)
+
+        results = [
+            check(pool.started == 4, f"All requests reached the pool (started={pool.started})"),
+            check(pool.cancelled == 3, f"Dropped requests were cancelled (cancelled={pool.cancelled})"),
+            check(pool.completed == 1, f"Only the connected request ran to completion (completed={pool.completed})"),
+            check(served["response"].status_code == 200, f"Connected client got its response ({served['response'].status_code})"),
+            check("X-Response-Time" in served["response"].headers, "Response time header is set"),
+            check(tracker.get_stats(ENDPOINT)["cancelled"] == 3, f"Tracker counted the cancellations ({tracker.get_stats(ENDPOINT)['cancelled']})"),
+        ]
+    finally:
+        server.should_exit = True
+        thread.join()
+
+    print()
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
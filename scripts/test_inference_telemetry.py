@@ -0,0 +1,90 @@
+"""
+Test script for inference telemetry: per-stage latency percentiles, per-worker
+load (requests, batches, utilization) and the batch-size / sequence-length
+histograms, both recorded directly and through a WorkerPool with fake workers.
+"""
+import sys
+import asyncio
+from utils.metrics import InferenceTelemetry
+from utils.worker import WorkerPool, BatchScheduler
+
+
+class FakeWorker:
+    def __init__(self, gpu_id: int):
+        self.gpu_id = gpu_id
+        self.generation = 0
+
+    async def run(self, method, texts, *args):
+        await asyncio.sleep(0.02)
+        timings = {"tokenize_ms": 1.0, "forward_ms": 15.0, "postprocess_ms": 0.5, "forwards": [(len(texts), 40)]}
+        return [{"text": text} for text in texts], timings
+
+    def close(self):
+        pass
+
+
+def check(passed, description):
+    print(f"{'✓ PASS' if passed else '✗ FAIL'} - {description}")
+    return passed
+
+
+def test_recording():
+    telemetry = InferenceTelemetry()
+    for ms in range(1, 101):
+        telemetry.record_stage("validate", float(ms))
+    telemetry.record_batch(0, 3, 50.0, {"tokenize_ms": 2.0, "forward_ms": 40.0, "postprocess_ms": 1.0, "forwards": [(3, 20)]})
+    telemetry.record_batch(0, 1, 10.0, {"tokenize_ms": 1.0, "forward_ms": 8.0, "postprocess_ms": 1.0, "forwards": [(1, 600)]})
+
+    stats = telemetry.get_stats()
+    validate = stats["stages"]["validate"]
+    worker = stats["workers"]["0"]
+    return [
+        check(validate["count"] == 100 and validate["p50_ms"] == 51 and validate["p95_ms"] == 96, f"Stage percentiles ({validate})"),
+        check(stats["stages"]["forward"]["count"] == 2, "Worker-reported stage timings are recorded"),
+        check(stats["stages"]["queue_wait"]["count"] == 0, "Unused stages report zeros"),
+        check(worker["requests"] == 4 and worker["batches"] == 2 and worker["avg_batch_size"] == 2, f"Per-worker counts ({worker['requests']} requests, {worker['batches']} batches)"),
+        check(worker["batch_sizes"]["<=4"] == 1 and worker["batch_sizes"]["<=1"] == 1, f"Batch-size histogram ({worker['batch_sizes']})"),
+        check(worker["seq_lengths"]["<=32"] == 1 and worker["seq_lengths"][">512"] == 1, f"Sequence-length histogram ({worker['seq_lengths']})"),
+    ]
+
+
+async def test_pool_records():
+    pool = WorkerPool(num_gpus=1)
+    worker = FakeWorker(0)
+    pool.workers.append(worker)
+    await pool.available_workers.put(worker)
+    pool.scheduler = BatchScheduler(pool, max_batch_size=8, max_wait_ms=10)
+    pool.scheduler.start()
+
+    await asyncio.gather(*(pool.scheduler.submit(f"text {i}") for i in range(6)))
+    await pool.scheduler.stop()
+
+    stats = pool.telemetry.get_stats()
+    return [
+        check(stats["stages"]["queue_wait"]["count"] == 6, f"Queue wait recorded per request ({stats['stages']['queue_wait']['count']})"),
+        check(stats["stages"]["queue_wait"]["p50_ms"] >= 5, f"Queue wait includes the batching window ({stats['stages']['queue_wait']['p50_ms']}ms)"),
+        check(stats["workers"]["0"]["requests"] == 6 and stats["workers"]["0"]["batches"] == 1, "Batched requests are counted once per batch"),
+        check(stats["workers"]["0"]["busy_ms"] >= 20, f"Worker busy time is measured ({stats['workers']['0']['busy_ms']}ms)"),
+        check(0 < stats["workers"]["0"]["utilization"] <= 100, f"Utilization is a percentage of uptime ({stats['workers']['0']['utilization']})"),
+    ]
+
+
+async def main():
+    print("=" * 60)
+    print("INFERENCE TELEMETRY TESTS")
+    print("=" * 60)
+    print()
+
+    results = []
+    for test in (test_recording, test_pool_records):
+        print(f"{test.__name__}:")
+        print("-" * 60)
+        outcome = test()
+        results += await outcome if asyncio.iscoroutine(outcome) else outcome
+        print()
+
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,96 @@
+"""
+Test script for chunked (sliding-window) classification: long texts are
+split into overlapping windows that fit the model, `num_chunks` and
+`truncated` describe the split, and `long_text_max_chunks` caps it.
+
+Uses the tiny BERT classifier from `test_worker_startup`, whose tokenizer is
+saved without a `model_max_length`, like the cardiffnlp checkpoints.
+"""
+import os
+import sys
+import torch
+import asyncio
+import tempfile
+import dataclasses
+from transformers import AutoTokenizer, AutoModelForSequenceClassification
+from scripts.test_worker_startup import make_tiny_model
+from utils.config import Config
+from utils.worker import Worker, WorkerPool
+
+
+def check(passed, description):
+    print(f"{'✓ PASS' if passed else '✗ FAIL'} - {description}")
+    return passed
+
+
+async def test_chunking(model_dir: str):
+    config = dataclasses.replace(
+        Config(), model_dir=model_dir, model_name="tiny/bert", cpu_workers=1,
+        warmup_seq_lengths=(16,), warmup_batch_sizes=(1,),
+        long_text_stride=128, long_text_max_chunks=3,
+    )
+    pool = WorkerPool()
+    try:
+        await pool.initialize(config)
+        await pool._warmup_task
+        window = pool.workers[0].max_length
+        tokenizer = pool.workers[0].tokenizer
+
+        short = await pool.classify_long("this product is great !")
+        # 508 content tokens per window (two go to [CLS] and [SEP]), 380 new ones per extra window
+        two_windows = await pool.classify_long("great " * 600)
+        capped = await pool.classify_long("bad " * 3000)
+        seq_lengths = pool.telemetry.get_stats()["workers"]["0"]["seq_lengths"]
+    finally:
+        await pool.shutdown()
+
+    return [
+        check(tokenizer.model_max_length > 10 ** 9, "Tokenizer reports no model_max_length (the cardiffnlp case)"),
+        check(window == 510, f"Window comes from the model's position embeddings ({window} tokens)"),
+        check(short["num_chunks"] == 1 and not short["truncated"], f"Short text is one window ({short['num_chunks']})"),
+        check(two_windows["num_chunks"] == 2 and not two_windows["truncated"], f"Long text is split into overlapping windows ({two_windows['num_chunks']})"),
+        check(capped["num_chunks"] == 3 and capped["truncated"], f"Windows are capped at long_text_max_chunks ({capped['num_chunks']}, truncated={capped['truncated']})"),
+        check(capped["predicted_label"] in ("negative", "neutral", "positive"), f"Windows are combined into one result ({capped['predicted_label']})"),
+        check(seq_lengths[">512"] == 0, "No forward pass is longer than the model accepts"),
+    ]
+
+
+def test_tokenizer_limit(model_dir: str):
+    path = os.path.join(model_dir, "tiny_bert")
+    worker = Worker(
+        gpu_id=0, device=torch.device("cpu"), model=AutoModelForSequenceClassification.from_pretrained(path),
+        tokenizer=AutoTokenizer.from_pretrained(path, model_max_length=64),
+    )
+    try:
+        result, timings = worker.classify_long("great " * 300, 16, 100)
+    finally:
+        worker.close()
+    return [
+        check(worker.max_length == 64, f"A smaller model_max_length on the tokenizer is kept ({worker.max_length})"),
+        check(all(length <= 64 for _, length in timings["forwards"]), f"Windows follow it ({timings['forwards']})"),
+        # 62 content tokens per window, 46 new ones per extra window
+        check(result["num_chunks"] == 7 and not result["truncated"], f"Window count follows it ({result['num_chunks']})"),
+    ]
+
+
+async def main():
+    print("=" * 60)
+    print("LONG TEXT (CHUNKED) CLASSIFICATION TESTS")
+    print("=" * 60)
+    print()
+
+    results = []
+    with tempfile.TemporaryDirectory() as model_dir:
+        make_tiny_model(model_dir, "tiny/bert")
+        for test in (test_chunking, test_tokenizer_limit):
+            print(f"{test.__name__}:")
+            print("-" * 60)
+            outcome = test(model_dir)
+            results += await outcome if asyncio.iscoroutine(outcome) else outcome
+            print()
+
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,138 @@
+"""
+Test script for zero-downtime model swaps: requests keep being answered
+while shadow workers load and warm up, old workers are drained once their
+in-flight work is released, and the pool's CPU plan, precision and thread
+settings only change at the switch (and not at all when the swap fails).
+
+Builds two tiny randomly initialised BERT classifiers in a temporary
+directory, so it needs no network access and runs in seconds.
+"""
+import sys
+import torch
+import asyncio
+import tempfile
+import dataclasses
+from scripts.test_worker_startup import make_tiny_model
+from utils.config import Config
+from utils.worker import WorkerPool
+
+
+def check(passed, description):
+    print(f"{'✓ PASS' if passed else '✗ FAIL'} - {description}")
+    return passed
+
+
+async def keep_classifying(pool: WorkerPool, stop: asyncio.Event, results: list, errors: list):
+    i = 0
+    while not stop.is_set():
+        # distinct texts, so every request reaches a worker instead of the result cache
+        requests = [pool.classify(f"this product is great {i + j}") for j in range(4)]
+        i += 4
+        for outcome in await asyncio.gather(*requests, return_exceptions=True):
+            (errors if isinstance(outcome, Exception) else results).append(outcome)
+
+
+async def test_swap(model_dir: str):
+    config = dataclasses.replace(
+        Config(), model_dir=model_dir, model_name="tiny/bert", cpu_workers=1, cpu_threads_per_worker=2,
+        warmup_seq_lengths=(16,), warmup_batch_sizes=(1, 4),
+    )
+    pool = WorkerPool()
+    await pool.initialize(config)
+    await pool._warmup_task
+    old_workers = list(pool.workers)
+
+    # look at what the pool reports while the shadow workers warm up
+    during = {}
+    warmup = pool._warmup
+
+    async def observed_warmup(config, workers):
+        during.update(plan=pool.cpu_plan, precision=pool.precision, threads=torch.get_num_threads(), generation=pool.generation)
+        await asyncio.sleep(0.2)
+        await warmup(config, workers)
+
+    pool._warmup = observed_warmup
+
+    stop = asyncio.Event()
+    results, errors = [], []
+    load = asyncio.create_task(keep_classifying(pool, stop, results, errors))
+    await asyncio.sleep(0.1)
+    before_swap = len(results)
+    try:
+        swap = await pool.swap_model(dataclasses.replace(config, model_name="tiny/bert-b", cpu_threads_per_worker=1))
+        after_swap = len(results)
+        await asyncio.sleep(0.1)
+    finally:
+        stop.set()
+        await load
+        pool._warmup = warmup
+
+    new_workers = list(pool.workers)
+    answered = len(results)
+    plan, precision = pool.cpu_plan, pool.precision
+    threads = torch.get_num_threads()
+    await pool.shutdown()
+
+    return [
+        check(not errors and answered > after_swap > before_swap, f"Requests are answered before, during and after the swap ({answered} answered, {len(errors)} errors)"),
+        check(during["plan"].intra_op_threads == 2 and during["threads"] == 2 and during["generation"] == 0, f"Live workers keep their CPU plan and threads while the shadow loads ({during['plan'].intra_op_threads} threads)"),
+        check(plan.intra_op_threads == 1 and threads == 1 and precision == "fp32", f"The new plan and threads apply at the switch ({plan.intra_op_threads} threads)"),
+        check(swap["generation"] == 1 and all(w.generation == 1 for w in new_workers), "New workers serve the next generation"),
+        check(not set(map(id, old_workers)) & set(map(id, new_workers)) and not pool.draining, f"Old workers are drained ({len(pool.draining)} still draining)"),
+        check(all(w.executor._shutdown for w in old_workers), "Drained workers are closed"),
+    ]
+
+
+async def test_failed_swap(model_dir: str):
+    config = dataclasses.replace(
+        Config(), model_dir=model_dir, model_name="tiny/bert", cpu_workers=1, cpu_threads_per_worker=2,
+        warmup_seq_lengths=(16,), warmup_batch_sizes=(1,),
+    )
+    pool = WorkerPool()
+    await pool.initialize(config)
+    await pool._warmup_task
+    workers = list(pool.workers)
+    plan = pool.cpu_plan
+
+    async def failing_warmup(config, workers):
+        raise RuntimeError("warmup failed")
+
+    pool._warmup = failing_warmup
+    try:
+        await pool.swap_model(dataclasses.replace(config, model_name="tiny/bert-b", cpu_threads_per_worker=1, precision="bf16"))
+        failed = False
+    except RuntimeError:
+        failed = True
+
+    result = await pool.classify("this product is great !")
+    state = (pool.cpu_plan, pool.precision, torch.get_num_threads(), pool.generation, pool.config.model_name)
+    await pool.shutdown()
+
+    return [
+        check(failed, "A swap whose warmup fails raises"),
+        check(state == (plan, "fp32", 2, 0, "tiny/bert"), f"The pool keeps its plan, precision, threads and model ({state[1]}, {state[2]} threads, {state[4]})"),
+        check(pool.workers == workers and result.get("predicted_label") is not None, "The old workers keep serving"),
+    ]
+
+
+async def main():
+    print("=" * 60)
+    print("MODEL SWAP TESTS")
+    print("=" * 60)
+    print()
+
+    results = []
+    with tempfile.TemporaryDirectory() as model_dir:
+        make_tiny_model(model_dir, "tiny/bert")
+        make_tiny_model(model_dir, "tiny/bert-b")
+        for test in (test_swap, test_failed_swap):
+            print(f"{test.__name__}:")
+            print("-" * 60)
+            results += await test(model_dir)
+            print()
+
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
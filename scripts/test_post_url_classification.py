@@ -0,0 +1,87 @@
+"""
+Test script for post URL classification: classify_post_url canonicalizes
+Instagram and Twitter/X URLs and extracts their shortcode in one parse, and
+classify_post_urls merges URLs that point at the same post.
+"""
+import sys
+from utils.validations import PostURL, classify_post_url, classify_post_urls, validate_post_url
+
+
+def check(passed, description):
+    print(f"{'✓ PASS' if passed else '✗ FAIL'} - {description}")
+    return passed
+
+
+def test_instagram():
+    cases = [
+        ("https://www.instagram.com/p/ABC123xyz_-/", ("p", "ABC123xyz_-", "https://www.instagram.com/p/ABC123xyz_-/")),
+        ("http://instagram.com/reel/Cq1w2E3r4T5?igsh=abc123", ("reel", "Cq1w2E3r4T5", "https://www.instagram.com/reel/Cq1w2E3r4T5/")),
+        ("  https://INSTAGRAM.com/tv/ABCDE/extra/path#frag  ", ("tv", "ABCDE", "https://www.instagram.com/tv/ABCDE/")),
+    ]
+    results = []
+    for url, (post_type, shortcode, canonical) in cases:
+        post_url, error = classify_post_url(url)
+        expected = PostURL(platform="instagram", post_type=post_type, shortcode=shortcode, canonical_url=canonical)
+        results.append(check(post_url == expected and error == "", f"{url.strip()} -> {canonical}"))
+
+    invalid = [
+        None, "", "instagram.com/p/ABCDE/", "https://example.com/p/ABCDE/", "https://www.instagram.com/",
+        "https://www.instagram.com/p/", "https://www.instagram.com/stories/ABCDE/", "https://www.instagram.com/p/ABC/",
+        "https://www.instagram.com/p/" + "A" * 21 + "/", "https://www.instagram.com/p/ABC$DE/",
+    ]
+    rejected = [url for url in invalid if classify_post_url(url)[0] is None and classify_post_url(url)[1]]
+    results.append(check(len(rejected) == len(invalid), f"Invalid Instagram URLs are rejected with a message ({len(rejected)}/{len(invalid)})"))
+    results.append(check(validate_post_url("https://www.instagram.com/p/ABCDE/") == (True, ""), "validate_post_url agrees with classify_post_url"))
+    return results
+
+
+def test_twitter():
+    status, _ = classify_post_url("https://twitter.com/user/status/12345?s=20", platform="Twitter")
+    profile, _ = classify_post_url("https://www.x.com/user", platform="twitter")
+    post_url, error = classify_post_url("https://www.instagram.com/p/ABCDE/", platform="twitter")
+    return [
+        check(status == PostURL("twitter", "status", "12345", "https://x.com/user/status/12345"), f"Tweet URLs are canonicalized to x.com ({status})"),
+        check(profile is not None and profile.post_type is None and profile.shortcode is None, "Non-status paths are valid without a shortcode"),
+        check(post_url is None and error.startswith("URL must be from Twitter/X"), "Other domains are rejected"),
+        check(classify_post_url("https://example.com/x", platform="mastodon") == (None, "Unsupported platform: mastodon"), "Unknown platforms are rejected"),
+    ]
+
+
+def test_dedupe():
+    urls = [
+        "https://www.instagram.com/p/ABCDE/",
+        "https://instagram.com/p/ABCDE?igsh=xyz",
+        "not a url",
+        "https://www.instagram.com/reel/FGHIJ/",
+        "http://www.instagram.com/p/ABCDE/?img_index=2#comments",
+        "https://www.instagram.com/p/FGHIJ/",
+        "",
+    ]
+    unique, invalid = classify_post_urls(urls)
+    return [
+        check(list(unique) == ["https://www.instagram.com/p/ABCDE/", "https://www.instagram.com/reel/FGHIJ/", "https://www.instagram.com/p/FGHIJ/"], f"Unique posts in first-seen order ({len(unique)})"),
+        check(unique["https://www.instagram.com/p/ABCDE/"][1] == [0, 1, 4], "Every input index is kept for a merged post"),
+        check(unique["https://www.instagram.com/p/ABCDE/"][0].shortcode == "ABCDE", "Each unique entry carries its PostURL"),
+        check([(i, url) for i, url, _ in invalid] == [(2, "not a url"), (6, "")], "Invalid URLs are reported with their index"),
+        check(all(error for _, _, error in invalid), "Invalid URLs keep their error message"),
+    ]
+
+
+def main():
+    print("=" * 60)
+    print("POST URL CLASSIFICATION TESTS")
+    print("=" * 60)
+    print()
+
+    results = []
+    for test in (test_instagram, test_twitter, test_dedupe):
+        print(f"{test.__name__}:")
+        print("-" * 60)
+        results += test()
+        print()
+
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Test script for the Instagram scrapper pool: concurrent requests for the
+same post share one upstream fetch and its result or error, coalesced
+callers are counted, cached captions skip the fetch, and slow fetches time
+out with ScrapperTimeout.
+
+`InstaScrapper.get_caption_from_shortcode` is replaced with a stand-in that
+sleeps instead of calling Instagram, so no network access is needed.
+"""
+import os
+import sys
+import time
+import asyncio
+import tempfile
+import threading
+from modules.scrapper.InstaScrapper import InstaScrapper
+from modules.scrapper.ScrapperPool import ScrapperPool
+from modules.scrapper.BaseScrapper import PostUnavailable, ScrapperTimeout
+from utils.cache import CaptionCache
+
+
+FETCHES = []
+_fetches_lock = threading.Lock()
+# methods the pool ran through each instance's async facade
+RUN_ASYNC = []
+
+
+def fake_get_caption_from_shortcode(self, shortcode: str):
+    with _fetches_lock:
+        FETCHES.append(shortcode)
+    time.sleep(0.5 if shortcode.startswith("SLOW") else 0.1)
+    if shortcode.startswith("GONE"):
+        raise PostUnavailable(f"Post {shortcode} is unavailable")
+    if shortcode.startswith("FAIL"):
+        raise ConnectionError("Instagram is down")
+    return f"caption of {shortcode}"
+
+
+_run_async = InstaScrapper.run_async
+
+
+async def counting_run_async(self, method: str, *args, **kwargs):
+    RUN_ASYNC.append(method)
+    return await _run_async(self, method, *args, **kwargs)
+
+
+async def make_pool(size: int = 2, timeout: float = None, cache: CaptionCache = None) -> ScrapperPool:
+    pool = ScrapperPool(size=size, timeout=timeout, cache=cache)
+    await pool.initialize()
+    return pool
+
+
+def check(passed, description):
+    print(f"{'✓ PASS' if passed else '✗ FAIL'} - {description}")
+    return passed
+
+
+async def test_coalescing():
+    FETCHES.clear()
+    RUN_ASYNC.clear()
+    pool = await make_pool()
+    captions = await asyncio.gather(*(pool.get_caption("ABCDE") for _ in range(5)))
+    errors = await asyncio.gather(*(pool.get_caption("FAIL1") for _ in range(3)), return_exceptions=True)
+    gone = await asyncio.gather(*(pool.get_caption("GONE1") for _ in range(3)), return_exceptions=True)
+    different = await asyncio.gather(pool.get_caption("AAAAA"), pool.get_caption("BBBBB"))
+    coalescing = pool.stats()["coalescing"]
+
+    return [
+        check(captions == ["caption of ABCDE"] * 5, "Concurrent callers share one caption"),
+        check(all(isinstance(e, ConnectionError) for e in errors), "Concurrent callers share one error"),
+        check(all(isinstance(e, PostUnavailable) for e in gone), "Unavailable posts raise PostUnavailable for every caller"),
+        check(different == ["caption of AAAAA", "caption of BBBBB"], "Different posts are fetched separately"),
+        check(sorted(FETCHES) == ["AAAAA", "ABCDE", "BBBBB", "FAIL1", "GONE1"], f"One upstream fetch per post ({len(FETCHES)} fetches)"),
+        check(coalescing["calls"] == 5 and coalescing["coalesced"] == 8, f"Coalesced callers are counted ({coalescing})"),
+        check(RUN_ASYNC == ["get_caption_from_shortcode"] * 5, f"Fetches go through the instances' run_async ({len(RUN_ASYNC)} calls)"),
+    ]
+
+
+async def test_cache():
+    FETCHES.clear()
+    with tempfile.TemporaryDirectory() as directory:
+        cache = CaptionCache(os.path.join(directory, "captions.sqlite3"))
+        pool = await make_pool(cache=cache)
+        first = await asyncio.gather(*(pool.get_caption("ABCDE") for _ in range(3)))
+        again = await pool.get_caption("ABCDE")
+        gone = await asyncio.gather(pool.get_caption("GONE1"), pool.get_caption("GONE1"), return_exceptions=True)
+        await asyncio.gather(pool.get_caption("GONE1"), return_exceptions=True)
+        failed = await asyncio.gather(pool.get_caption("FAIL1"), return_exceptions=True)
+        await asyncio.gather(pool.get_caption("FAIL1"), return_exceptions=True)
+        cache.close()
+
+    return [
+        check(first == ["caption of ABCDE"] * 3 and again == "caption of ABCDE", "Cached captions are served to later callers"),
+        check(all(isinstance(e, PostUnavailable) for e in gone), "Unavailable posts are served from the negative cache"),
+        check(isinstance(failed[0], ConnectionError), "Other errors are passed to the caller"),
+        check(FETCHES == ["ABCDE", "GONE1", "FAIL1", "FAIL1"], f"Only captions and unavailable posts are cached ({FETCHES})"),
+    ]
+
+
+async def test_timeout():
+    FETCHES.clear()
+    pool = await make_pool(size=1, timeout=0.2)
+    start = time.perf_counter()
+    slow = await asyncio.gather(pool.get_caption("SLOW1"), return_exceptions=True)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    # the only instance is still busy with SLOW1, so the next caller can't check one out
+    waiting = await asyncio.gather(pool.get_caption("ABCDE"), return_exceptions=True)
+    stats = pool.stats()
+    await asyncio.sleep(0.4)
+    recovered = await pool.get_caption("ABCDE")
+
+    return [
+        check(all(scrapper.timeout == 0.2 for scrapper in pool.scrappers), "Instances take the pool's timeout"),
+        check(isinstance(slow[0], ScrapperTimeout) and elapsed_ms < 400, f"Slow fetches time out ({elapsed_ms:.0f}ms)"),
+        check(isinstance(waiting[0], ScrapperTimeout) and stats["acquire_timeouts"] == 1, "Waiting for a busy instance times out too"),
+        check(recovered == "caption of ABCDE", "The instance returns to the pool once its call finishes"),
+    ]
+
+
+async def main():
+    print("=" * 60)
+    print("SCRAPPER POOL TESTS")
+    print("=" * 60)
+    print()
+
+    InstaScrapper.get_caption_from_shortcode = fake_get_caption_from_shortcode
+    InstaScrapper.run_async = counting_run_async
+
+    results = []
+    for test in (test_coalescing, test_cache, test_timeout):
+        print(f"{test.__name__}:")
+        print("-" * 60)
+        results += await test()
+        print()
+
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,131 @@
+"""
+Test script for the caching helpers: LRUCache expiry and eviction,
+SingleFlight call sharing and cancellation, and SentimentCache keying.
+"""
+import sys
+import time
+import asyncio
+from utils.cache import LRUCache, SingleFlight, SentimentCache
+
+
+def check(passed, description):
+    print(f"{'✓ PASS' if passed else '✗ FAIL'} - {description}")
+    return passed
+
+
+def test_lru_cache():
+    cache = LRUCache(max_entries=2, ttl_seconds=0.1)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")  # "a" is now the most recently used
+    cache.set("c", 3)
+    evicted = cache.get("b") is None and cache.get("a") == 1 and cache.get("c") == 3
+    evictions = cache.evictions
+
+    cache.set("short", 4, ttl_seconds=0.05)
+    time.sleep(0.06)
+    expired = cache.get("short", "missing") == "missing"
+
+    empty = LRUCache(max_entries=0)
+    empty.set("a", 1)
+
+    return [
+        check(evicted, "Least recently used entry is evicted first"),
+        check(evictions == 1, f"Evictions are counted ({evictions})"),
+        check(expired and cache.expirations == 1, "Entries expire after their TTL"),
+        check(len(empty) == 0, "max_entries=0 disables the cache"),
+    ]
+
+
+async def test_singleflight():
+    flight = SingleFlight()
+    calls = []
+
+    async def fetch(value):
+        calls.append(value)
+        await asyncio.sleep(0.05)
+        if value == "bad":
+            raise ValueError("bad value")
+        return value
+
+    shared = await asyncio.gather(*(flight.do("key", lambda: fetch("ok")) for _ in range(5)))
+    errors = await asyncio.gather(*(flight.do("bad", lambda: fetch("bad")) for _ in range(3)), return_exceptions=True)
+
+    # one waiter leaving must not cancel the call the others still wait on
+    calls.clear()
+    first = asyncio.create_task(flight.do("slow", lambda: fetch("slow")))
+    second = asyncio.create_task(flight.do("slow", lambda: fetch("slow")))
+    await asyncio.sleep(0.01)
+    first.cancel()
+    survived = await second
+
+    # the shared call is cancelled once every waiter has gone
+    only = asyncio.create_task(flight.do("gone", lambda: fetch("gone")))
+    await asyncio.sleep(0.01)
+    only.cancel()
+    await asyncio.gather(only, return_exceptions=True)
+    await asyncio.sleep(0)
+    gone_in_flight = flight.in_flight()
+    survived_calls = list(calls)
+    counted = flight.stats()
+
+    # a caller arriving right after the last waiter cancelled starts a fresh call
+    abandoned = asyncio.create_task(flight.do("viral", lambda: fetch("viral")))
+    await asyncio.sleep(0.01)
+    abandoned.cancel()
+    await asyncio.sleep(0)
+    late = asyncio.create_task(flight.do("viral", lambda: fetch("viral")))
+    late_result = (await asyncio.gather(late, return_exceptions=True))[0]
+    await asyncio.gather(abandoned, return_exceptions=True)
+
+    return [
+        check(shared == ["ok"] * 5, "Concurrent callers share one result"),
+        check(all(isinstance(e, ValueError) for e in errors), "Concurrent callers share one exception"),
+        check(counted["calls"] == 4 and counted["coalesced"] == 7, f"Calls and coalesced waiters are counted ({counted})"),
+        check(survived == "slow" and survived_calls == ["slow", "gone"], "Shared call survives one waiter cancelling"),
+        check(gone_in_flight == 0, "Call is cancelled and forgotten once every waiter is gone"),
+        check(late_result == "viral" and flight.calls == counted["calls"] + 2, f"A caller arriving after the last waiter cancelled starts a fresh call ({late_result!r})"),
+    ]
+
+
+async def test_sentiment_cache_keys():
+    cache = SentimentCache("model-a")
+    other_model = SentimentCache("model-b")
+    computed = []
+
+    async def compute(text):
+        computed.append(text)
+        await asyncio.sleep(0.01)
+        return {"label": "positive"}
+
+    await asyncio.gather(*(cache.get_or_compute("Great  product ", compute) for _ in range(3)))
+    await cache.get_or_compute("Great product", compute)
+    await cache.get_or_compute("Great product", compute, variant="long")
+
+    return [
+        check(cache.key("Great  product ") == cache.key("Great product"), "Whitespace variants share a key"),
+        check(cache.key("Great product") != other_model.key("Great product"), "Different models never share a key"),
+        check(cache.key("Great product") != cache.key("Great product", variant="long"), "Result variants never share a key"),
+        check(len(computed) == 2, f"Each key is computed once, concurrent misses included ({len(computed)} computes)"),
+    ]
+
+
+async def main():
+    print("=" * 60)
+    print("CACHE TESTS")
+    print("=" * 60)
+    print()
+
+    results = []
+    for test in (test_lru_cache, test_singleflight, test_sentiment_cache_keys):
+        print(f"{test.__name__}:")
+        print("-" * 60)
+        outcome = test()
+        results += await outcome if asyncio.iscoroutine(outcome) else outcome
+        print()
+
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
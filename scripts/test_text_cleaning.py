@@ -0,0 +1,153 @@
+"""
+Test script for the text cleaning pipeline: CleaningPipeline, clean_text,
+clean_texts and clean_stream give the same output as the original one-pass-
+per-option cleaner for every combination of options.
+
+The original cleaner is embedded below as the reference. Its preserve-case
+placeholders contained letters and were lowercased before being restored, so
+the reference uses letter-free placeholders as the pipeline does.
+"""
+import re
+import sys
+import html
+import string
+import itertools
+from utils.text_cleaning import (
+    _URL_RE, _HTML_TAG_RE, _MENTION_RE, _HASHTAG_RE, _EMOJI_RE, _MULTI_WS_RE, _MULTI_NEWLINE_RE,
+    CleaningPipeline, get_pipeline, clean_text, clean_texts, clean_stream,
+)
+
+
+FLAGS = (
+    "lower", "strip_html", "remove_urls", "remove_mentions", "remove_hashtag_symbol",
+    "remove_emojis", "remove_punctuation", "normalize_newlines", "normalize_whitespace",
+)
+
+PRESERVE_WORDS = ((), ("NASA", "iPhone"), ("New York", "NASA", "NASA"))
+
+SAMPLES = [
+    "",
+    "plain text",
+    "<p>Hello World! Visit https://example.com 👋 #Welcome @user</p>",
+    "Here's some mixed TEXT — with punctuation!!! and emojis 😊😊",
+    "Loving my new iPhone from NASA!!\n\n\n  #tech #NASA @apple www.apple.com/iphone",
+    "Trip to New York 🇺🇸🗽\r\n\r\nbest city @NYC&amp;friends <br/>see https://t.co/abc?x=1",
+    "email@example.com and @mention_1 then #hash#tag and &lt;b&gt;bold&lt;/b&gt;",
+    "\t\n  whitespace only  \n\t",
+    "✂ dingbats ✈ and Ⓜ circled, NASA's iPhones vs. iPhone",
+    "newyork NEW YORK New York New Yorker NASA_X nasa",
+]
+
+
+def reference_clean_text(
+    text, lower=False, strip_html=False, remove_urls=False, remove_mentions=False,
+    remove_hashtag_symbol=False, remove_emojis=False, remove_punctuation=False,
+    normalize_newlines=False, normalize_whitespace=False, preserve_case_words=(),
+):
+    if not text:
+        return ""
+
+    text = str(text)
+    if strip_html:
+        text = _HTML_TAG_RE.sub(" ", text)
+        text = html.unescape(text)
+    if remove_urls:
+        text = _URL_RE.sub(" ", text)
+    if remove_mentions:
+        text = _MENTION_RE.sub(" ", text)
+    if remove_hashtag_symbol:
+        text = _HASHTAG_RE.sub("", text)
+    if remove_emojis:
+        text = _EMOJI_RE.sub("", text)
+    if remove_punctuation:
+        text = text.translate(str.maketrans("", "", string.punctuation))
+    if normalize_newlines:
+        text = _MULTI_NEWLINE_RE.sub("\n", text)
+    if normalize_whitespace:
+        text = _MULTI_WS_RE.sub(" ", text).strip()
+    if lower:
+        placeholders = {}
+        for i, w in enumerate(preserve_case_words):
+            key = f"\x00{i}\x00"
+            placeholders[key] = w
+            text = re.sub(rf"\b{re.escape(w)}\b", key, text)
+        text = text.lower()
+        for key, w in placeholders.items():
+            text = text.replace(key, w)
+    return text
+
+
+def option_sets():
+    for values in itertools.product((False, True), repeat=len(FLAGS)):
+        options = dict(zip(FLAGS, values))
+        for words in PRESERVE_WORDS if options["lower"] else ((),):
+            yield dict(options, preserve_case_words=words)
+
+
+def check(passed, description):
+    print(f"{'✓ PASS' if passed else '✗ FAIL'} - {description}")
+    return passed
+
+
+def test_matches_reference():
+    combinations = 0
+    mismatches = []
+    for options in option_sets():
+        combinations += 1
+        pipeline = CleaningPipeline(**options)
+        for sample in SAMPLES:
+            expected = reference_clean_text(sample, **options)
+            if pipeline(sample) != expected or clean_text(sample, **options) != expected:
+                mismatches.append((options, sample))
+
+    for options, sample in mismatches[:5]:
+        print(f"  mismatch: {sample!r} with {options}")
+    return [
+        check(not mismatches, f"Pipeline and clean_text match the reference ({combinations} option sets, {len(mismatches)} mismatches)"),
+    ]
+
+
+def test_fused_passes():
+    pipeline = CleaningPipeline(
+        lower=True, remove_hashtag_symbol=True, remove_emojis=True, remove_punctuation=True,
+        normalize_newlines=True, normalize_whitespace=True,
+    )
+    return [
+        check(pipeline.describe() == ["remove_hashtag_symbol+remove_emojis+remove_punctuation", "normalize_whitespace", "lower"], f"Deletions share one pass and newlines are subsumed ({pipeline.describe()})"),
+        check(CleaningPipeline().describe() == [], "No options, no passes"),
+        check(get_pipeline(lower=True, preserve_case_words=["NASA"]) is get_pipeline(lower=True, preserve_case_words=("NASA",)), "Pipelines are cached per option set"),
+    ]
+
+
+def test_batch_and_stream():
+    options = {"lower": True, "strip_html": True, "remove_urls": True, "normalize_whitespace": True, "preserve_case_words": ["NASA"]}
+    texts = SAMPLES * 50
+    expected = [reference_clean_text(t, **options) for t in texts]
+
+    in_process = list(clean_stream(iter(texts), processes=1, chunk_size=7, **options))
+    pooled = list(clean_stream(iter(texts), processes=2, chunk_size=7, max_in_flight=3, **options))
+    return [
+        check(clean_texts(texts, **options) == expected, "clean_texts matches the reference"),
+        check(in_process == expected, "clean_stream in one process keeps input order"),
+        check(pooled == expected, "clean_stream across processes keeps input order"),
+    ]
+
+
+def main():
+    print("=" * 60)
+    print("TEXT CLEANING TESTS")
+    print("=" * 60)
+    print()
+
+    results = []
+    for test in (test_matches_reference, test_fused_passes, test_batch_and_stream):
+        print(f"{test.__name__}:")
+        print("-" * 60)
+        results += test()
+        print()
+
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Test script for WorkerPool startup: the model is read from disk once, every
+startup stage is timed, and the pool only reports ready after warmup.
+
+Builds a tiny randomly initialised BERT classifier in a temporary directory,
+so it needs no network access and runs in seconds.
+"""
+import os
+import sys
+import asyncio
+import tempfile
+import dataclasses
+from transformers import BertConfig, BertForSequenceClassification, BertTokenizerFast
+import utils.worker
+from utils.config import Config
+from utils.worker import WorkerPool
+
+
+VOCAB = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]", "this", "product", "is", "great", "bad", "!"]
+
+
+def make_tiny_model(model_dir: str, model_name: str):
+    """Save a tiny untrained classifier where WorkerPool expects `model_name` to be."""
+    path = os.path.join(model_dir, model_name.replace("/", "_"))
+    os.makedirs(path)
+    vocab_file = os.path.join(model_dir, "vocab.txt")
+    with open(vocab_file, "w") as f:
+        f.write("\n".join(VOCAB))
+
+    config = BertConfig(
+        vocab_size=len(VOCAB), hidden_size=32, num_hidden_layers=2, num_attention_heads=2, intermediate_size=64,
+        num_labels=3, id2label={0: "negative", 1: "neutral", 2: "positive"},
+        label2id={"negative": 0, "neutral": 1, "positive": 2},
+    )
+    BertForSequenceClassification(config).save_pretrained(path)
+    BertTokenizerFast(vocab_file=vocab_file).save_pretrained(path)
+
+
+def check(passed, description):
+    print(f"{'✓ PASS' if passed else '✗ FAIL'} - {description}")
+    return passed
+
+
+async def test_startup(model_dir: str):
+    loads = []
+    load_model = utils.worker.load_model
+
+    def counting_load_model(*args):
+        loads.append(args)
+        return load_model(*args)
+
+    utils.worker.load_model = counting_load_model
+    config = dataclasses.replace(
+        Config(), model_dir=model_dir, model_name="tiny/bert", cpu_workers=1,
+        warmup_seq_lengths=(16,), warmup_batch_sizes=(1, 4),
+    )
+
+    pool = WorkerPool()
+    try:
+        await pool.initialize(config)
+        ready_before_warmup = pool.ready
+        await pool._warmup_task
+        result = await pool.classify("this product is great !")
+    finally:
+        utils.worker.load_model = load_model
+        await pool.shutdown()
+
+    stages = set(pool.startup_timings)
+    return [
+        check(len(loads) == 1, f"Model weights were read from disk once ({len(loads)} loads)"),
+        check({"download", "disk_read", "device_transfer", "warmup"} <= stages, f"Every startup stage is timed ({sorted(stages)})"),
+        check(not ready_before_warmup and pool.ready, "Pool reports ready only after warmup"),
+        check(result.get("predicted_label") in ("negative", "neutral", "positive"), f"Warmed pool classifies ({result.get('predicted_label')})"),
+    ]
+
+
+async def main():
+    print("=" * 60)
+    print("WORKER POOL STARTUP TESTS")
+    print("=" * 60)
+    print()
+
+    with tempfile.TemporaryDirectory() as model_dir:
+        make_tiny_model(model_dir, "tiny/bert")
+        results = await test_startup(model_dir)
+    print()
+
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,345 @@
+"""
+Inference backends for the sentiment classifier.
+
+Every backend returns a model-like object that can be called as
+`model(input_ids=..., attention_mask=...)`, returns an output with `.logits`
+and exposes the Hugging Face `config` (for `id2label`), so `Worker` works
+with any of them unchanged.
+"""
+import os
+import time
+import torch
+import logging
+import importlib.util
+from typing import List
+from transformers import AutoConfig, AutoTokenizer, AutoModelForSequenceClassification
+from transformers.modeling_outputs import SequenceClassifierOutput
+
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("torch", "onnx", "torchscript")
+
+# optional packages a backend needs, installed with the extra of the same name
+BACKEND_REQUIREMENTS = {
+    "onnx": ("onnx", "onnxruntime", "onnxscript"),
+}
+
+ONNX_FILENAME = "model.onnx"
+TORCHSCRIPT_FILENAME = "model.torchscript.pt"
+INT8_FILENAME = "model.int8.pt"
+
+SAMPLE_TEXTS_PATH = os.path.join("assets", "sentiment_samples.txt")
+
+# max absolute logit difference an exported model may have against eager PyTorch
+PARITY_ATOL = 1e-3
+
+
+def check_backend_requirements(backend: str):
+    """Raise ImportError naming every optional package `backend` needs that is not installed."""
+    missing = [module for module in BACKEND_REQUIREMENTS.get(backend, ()) if importlib.util.find_spec(module) is None]
+    if missing:
+        raise ImportError(
+            f"The {backend} backend requires {', '.join(missing)} "
+            f"(install the extra: pip install '.[{backend}]' or uv sync --extra {backend})"
+        )
+
+
+def load_sample_texts(path: str = SAMPLE_TEXTS_PATH) -> List[str]:
+    """Load the bundled sample captions used for parity and accuracy checks."""
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+class _LogitsOnly(torch.nn.Module):
+    """Exposes a Hugging Face classifier as `(input_ids, attention_mask) -> logits` for tracing."""
+
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, input_ids, attention_mask):
+        return _logits(self.model, input_ids, attention_mask)
+
+
+def _logits(model, input_ids, attention_mask):
+    # index instead of `.logits` so tuple outputs (torchscript=True) work too
+    return model(input_ids=input_ids, attention_mask=attention_mask)[0]
+
+
+class OnnxModel:
+    """
+    Serves an exported ONNX graph through ONNX Runtime's CPU execution provider.
+
+    The inference session is created lazily on first use so that a pickled
+    copy (e.g. sent to a `ProcessWorker`) builds its own session in the child
+    using that process's torch thread count.
+    """
+
+    def __init__(self, path: str, config):
+        self.path = path
+        self.config = config
+        self._session = None
+
+    def __getstate__(self):
+        return {"path": self.path, "config": self.config}
+
+    def __setstate__(self, state):
+        self.__init__(state["path"], state["config"])
+
+    @property
+    def session(self):
+        if self._session is None:
+            try:
+                import onnxruntime as ort
+            except ImportError as e:
+                raise ImportError("The onnx backend requires onnxruntime (pip install '.[onnx]')") from e
+
+            options = ort.SessionOptions()
+            options.intra_op_num_threads = torch.get_num_threads()
+            self._session = ort.InferenceSession(self.path, options, providers=["CPUExecutionProvider"])
+        return self._session
+
+    def __call__(self, input_ids, attention_mask, **kwargs):
+        logits = self.session.run(
+            ["logits"],
+            {"input_ids": input_ids.cpu().numpy(), "attention_mask": attention_mask.cpu().numpy()},
+        )[0]
+        return SequenceClassifierOutput(logits=torch.from_numpy(logits))
+
+    def to(self, device):
+        if torch.device(device).type != "cpu":
+            raise ValueError("The onnx backend only runs on the CPU execution provider")
+        return self
+
+    def eval(self):
+        return self
+
+    def share_memory(self):
+        return self
+
+
+class TorchScriptModel:
+    """Serves a traced TorchScript module, reloaded from disk when pickled to another process."""
+
+    def __init__(self, path: str, config):
+        self.path = path
+        self.config = config
+        self.module = torch.jit.load(path, map_location="cpu")
+        self.module.eval()
+
+    def __getstate__(self):
+        return {"path": self.path, "config": self.config}
+
+    def __setstate__(self, state):
+        self.__init__(state["path"], state["config"])
+
+    def __call__(self, input_ids, attention_mask, **kwargs):
+        return SequenceClassifierOutput(logits=self.module(input_ids, attention_mask))
+
+    def to(self, device):
+        self.module.to(device)
+        return self
+
+    def eval(self):
+        return self
+
+    def share_memory(self):
+        return self
+
+
+def _example_inputs(tokenizer):
+    inputs = tokenizer(["Export example text", "a second, slightly longer example text"], return_tensors="pt", padding=True)
+    return inputs["input_ids"], inputs["attention_mask"]
+
+
+def export_onnx(local_model_path: str, path: str):
+    model = AutoModelForSequenceClassification.from_pretrained(local_model_path).eval()
+    tokenizer = AutoTokenizer.from_pretrained(local_model_path)
+
+    logger.info(f"Exporting {local_model_path} to ONNX at {path}")
+    with torch.no_grad():
+        torch.onnx.export(
+            _LogitsOnly(model),
+            _example_inputs(tokenizer),
+            path,
+            input_names=["input_ids", "attention_mask"],
+            output_names=["logits"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "sequence"},
+                "attention_mask": {0: "batch", 1: "sequence"},
+                "logits": {0: "batch"},
+            },
+            opset_version=17,
+        )
+
+    _verify_export(model, OnnxModel(path, model.config), tokenizer, path)
+
+
+def export_torchscript(local_model_path: str, path: str):
+    model = AutoModelForSequenceClassification.from_pretrained(local_model_path, torchscript=True).eval()
+    tokenizer = AutoTokenizer.from_pretrained(local_model_path)
+
+    logger.info(f"Exporting {local_model_path} to TorchScript at {path}")
+    with torch.no_grad():
+        traced = torch.jit.trace(_LogitsOnly(model), _example_inputs(tokenizer))
+    torch.jit.save(traced, path)
+
+    _verify_export(model, TorchScriptModel(path, model.config), tokenizer, path)
+
+
+def _verify_export(reference, candidate, tokenizer, path: str):
+    """Remove the exported file and raise if it does not match the eager model's logits."""
+    parity = compare_models(reference, candidate, tokenizer, load_sample_texts())
+    logger.info(f"Export parity for {path}: {parity}")
+    if parity["max_abs_diff"] > PARITY_ATOL:
+        os.remove(path)
+        raise RuntimeError(f"Exported model at {path} failed the parity check: {parity}")
+
+
+def load_model(backend: str, local_model_path: str):
+    """
+    Load the classifier saved at `local_model_path` for `backend`.
+
+    Exported backends are written next to the saved model the first time
+    they are requested and reused on later startups.
+    """
+    check_backend_requirements(backend)
+
+    if backend == "torch":
+        return AutoModelForSequenceClassification.from_pretrained(local_model_path)
+
+    if backend == "onnx":
+        path = os.path.join(local_model_path, ONNX_FILENAME)
+        if not os.path.exists(path):
+            export_onnx(local_model_path, path)
+        return OnnxModel(path, AutoConfig.from_pretrained(local_model_path))
+
+    if backend == "torchscript":
+        path = os.path.join(local_model_path, TORCHSCRIPT_FILENAME)
+        if not os.path.exists(path):
+            export_torchscript(local_model_path, path)
+        return TorchScriptModel(path, AutoConfig.from_pretrained(local_model_path))
+
+    raise ValueError(f"Unsupported backend: {backend}. Must be one of: {', '.join(BACKENDS)}")
+
+
+def load_int8_model(local_model_path: str, min_agreement: float, max_confidence_delta: float):
+    """
+    Load a dynamically int8-quantized copy of the classifier for CPU inference.
+
+    The quantized model is cached next to the saved model so later startups
+    skip quantization. Before it is returned it must agree with the fp32
+    model on the bundled sample set; if it does not, the fp32 model is
+    returned instead.
+
+    Returns:
+        tuple: (model, report) where report["accepted"] tells which one was returned
+        and report["path"] is where the int8 model is cached
+    """
+    path = os.path.join(local_model_path, INT8_FILENAME)
+    reference = AutoModelForSequenceClassification.from_pretrained(local_model_path).eval()
+
+    if os.path.exists(path):
+        logger.info(f"Loading cached int8 model from {path}")
+        quantized = load_saved_int8_model(path)
+    else:
+        logger.info(f"Quantizing {local_model_path} to dynamic int8")
+        quantized = torch.ao.quantization.quantize_dynamic(reference, {torch.nn.Linear}, dtype=torch.qint8)
+        torch.save(quantized, path)
+        logger.info(f"Saved int8 model to {path}")
+    quantized.eval()
+
+    tokenizer = AutoTokenizer.from_pretrained(local_model_path)
+    report = compare_models(reference, quantized, tokenizer, load_sample_texts())
+    report["path"] = path
+    report["accepted"] = (
+        report["label_agreement"] >= min_agreement
+        and report["max_confidence_delta"] <= max_confidence_delta
+    )
+
+    if not report["accepted"]:
+        logger.error(f"int8 model failed the accuracy check, serving fp32 instead: {report}")
+        return reference, report
+
+    logger.info(f"int8 model passed the accuracy check: {report}")
+    return quantized, report
+
+
+def load_saved_int8_model(path: str):
+    """Load an int8 model cached by `load_int8_model` (dynamic-quantized modules can't be shared across processes)."""
+    model = torch.load(path, weights_only=False)
+    model.eval()
+    return model
+
+
+def compare_models(reference, candidate, tokenizer, texts: List[str], batch_size: int = 8) -> dict:
+    """
+    Compare a candidate model's predictions against a reference model.
+
+    Returns:
+        dict with keys: samples, max_abs_diff (logits), label_agreement (%),
+        max_confidence_delta, mean_confidence_delta
+    """
+    max_abs_diff = 0.0
+    agreements = 0
+    confidence_deltas = []
+
+    for start in range(0, len(texts), batch_size):
+        inputs = tokenizer(texts[start:start + batch_size], return_tensors="pt", padding=True, truncation=True)
+        with torch.no_grad():
+            ref_logits = _logits(reference, inputs["input_ids"], inputs["attention_mask"]).float()
+            cand_logits = _logits(candidate, inputs["input_ids"], inputs["attention_mask"]).float()
+
+        max_abs_diff = max(max_abs_diff, (ref_logits - cand_logits).abs().max().item())
+
+        ref_probs = torch.softmax(ref_logits, dim=-1)
+        cand_probs = torch.softmax(cand_logits, dim=-1)
+        ref_labels = ref_probs.argmax(dim=-1)
+        agreements += (ref_labels == cand_probs.argmax(dim=-1)).sum().item()
+
+        # confidence each model gives to the reference label
+        ref_conf = ref_probs.gather(1, ref_labels.unsqueeze(1)).squeeze(1)
+        cand_conf = cand_probs.gather(1, ref_labels.unsqueeze(1)).squeeze(1)
+        confidence_deltas.extend((ref_conf - cand_conf).abs().tolist())
+
+    return {
+        "samples": len(texts),
+        "max_abs_diff": round(max_abs_diff, 6),
+        "label_agreement": round(agreements / len(texts) * 100, 2) if texts else 0,
+        "max_confidence_delta": round(max(confidence_deltas), 4) if confidence_deltas else 0,
+        "mean_confidence_delta": round(sum(confidence_deltas) / len(confidence_deltas), 4) if confidence_deltas else 0,
+    }
+
+
+def measure_latency(model, tokenizer, texts: List[str], batch_size: int = 8, iterations: int = 20) -> dict:
+    """Time forward passes over `texts` in batches of `batch_size` (after one untimed warmup pass)."""
+    batches = [
+        tokenizer(texts[start:start + batch_size], return_tensors="pt", padding=True, truncation=True)
+        for start in range(0, len(texts), batch_size)
+    ]
+
+    with torch.no_grad():
+        for inputs in batches:
+            model(input_ids=inputs["input_ids"], attention_mask=inputs["attention_mask"])
+
+        timings = []
+        for _ in range(iterations):
+            for inputs in batches:
+                start = time.perf_counter()
+                model(input_ids=inputs["input_ids"], attention_mask=inputs["attention_mask"])
+                timings.append((time.perf_counter() - start) * 1000)
+
+    timings.sort()
+    count = len(timings)
+    return {
+        "batch_size": batch_size,
+        "batches": count,
+        "avg_ms": round(sum(timings) / count, 2),
+        "p50_ms": round(timings[int(count * 0.50)], 2),
+        "p95_ms": round(timings[int(count * 0.95)], 2),
+        "texts_per_second": round(len(texts) * iterations / (sum(timings) / 1000), 1),
+    }
+
+
+__all__ = ['BACKENDS', 'check_backend_requirements', 'load_model', 'load_int8_model', 'load_saved_int8_model', 'load_sample_texts', 'compare_models', 'measure_latency']
@@ -0,0 +1,365 @@
+"""
+Caching helpers: a TTL-aware LRU cache, singleflight call coalescing, and
+the sentiment result and Instagram caption caches built on them.
+"""
+import os
+import time
+import asyncio
+import sqlite3
+import hashlib
+import logging
+import threading
+from dataclasses import dataclass
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from utils.text_cleaning import clean_text
+
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    Bounded least-recently-used cache where every entry expires after `ttl_seconds`.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        # Structure: {key: (expires_at, value)}
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return the cached value for `key`, or `default` if missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return default
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None):
+        if self.max_entries <= 0:
+            return
+
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key: str):
+        self._entries.pop(key, None)
+
+    def pop_where(self, predicate: Callable[[str, Any], bool]) -> int:
+        """Remove every entry for which `predicate(key, value)` is true and return how many were removed."""
+        keys = [key for key, (_, value) in self._entries.items() if predicate(key, value)]
+        for key in keys:
+            del self._entries[key]
+        return len(keys)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": round((self.hits / lookups) * 100, 2) if lookups else 0,
+        }
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time; concurrent callers with the same
+    key wait for and share the first caller's result (or exception).
+
+    The shared call is only cancelled once every caller waiting on it has gone away.
+    """
+
+    def __init__(self):
+        # Structure: {key: [future, waiter_count]}
+        self._calls: Dict[str, list] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    def waiting(self) -> int:
+        """Number of callers currently waiting on a shared call."""
+        return sum(call[1] for call in self._calls.values())
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        call = self._calls.get(key)
+        if call is None:
+            future = asyncio.ensure_future(fn())
+            call = self._calls[key] = [future, 0]
+            future.add_done_callback(lambda _, key=key, call=call: self._forget(key, call))
+            self.calls += 1
+        else:
+            self.coalesced += 1
+
+        future = call[0]
+        call[1] += 1
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            if not future.done() and call[1] == 1:
+                future.cancel()
+                # forget it now rather than in the done callback a loop iteration
+                # later, so a caller arriving in between starts a fresh call
+                self._forget(key, call)
+            raise
+        finally:
+            call[1] -= 1
+
+    def _forget(self, key: str, call: list):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._calls),
+            "waiting": self.waiting(),
+        }
+
+
+class SentimentCache:
+    """
+    Caches sentiment results keyed by a hash of the normalized text and model name.
+
+    Misses for the same key that arrive while an inference is already running
+    share that inference instead of starting their own.
+    """
+
+    def __init__(self, model_name: str, max_entries: int = 10000, ttl_seconds: float = 3600):
+        self.model_name = model_name
+        self.lru = LRUCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self.singleflight = SingleFlight()
+
+    def key(self, text: str, variant: str = "") -> str:
+        """Hash of the model name, result variant (e.g. "long" for chunked results) and normalized text."""
+        normalized = clean_text(text, normalize_whitespace=True)
+        return hashlib.sha256(f"{self.model_name}\x00{variant}\x00{normalized}".encode("utf-8")).hexdigest()
+
+    async def get_or_compute(self, text: str, compute: Callable[[str], Awaitable[dict]], variant: str = "") -> dict:
+        key = self.key(text, variant)
+        result = self.lru.get(key, _MISSING)
+        if result is not _MISSING:
+            return result
+
+        async def _compute():
+            result = await compute(text)
+            self.lru.set(key, result)
+            return result
+
+        return await self.singleflight.do(key, _compute)
+
+    def get_many(self, texts: List[str]) -> List[Optional[dict]]:
+        """Look up several texts at once, returning None for every miss."""
+        return [self.lru.get(self.key(text)) for text in texts]
+
+    def set_many(self, texts: List[str], results: List[dict]):
+        for text, result in zip(texts, results):
+            self.lru.set(self.key(text), result)
+
+    def clear(self):
+        self.lru.clear()
+
+    def stats(self) -> dict:
+        return {
+            "model_name": self.model_name,
+            **self.lru.stats(),
+            "coalesced": self.singleflight.coalesced,
+            "in_flight": self.singleflight.in_flight(),
+        }
+
+
+@dataclass(frozen=True)
+class CachedCaption:
+    """A fetched caption, or a record that the post could not be fetched (deleted, private, ...)."""
+    caption: Optional[str]
+    unavailable: bool = False
+    reason: str = ""
+    fetched_at: float = 0.0
+
+
+class CaptionStore:
+    """
+    SQLite table of captions keyed by shortcode, so cached captions survive restarts.
+
+    Expiry uses wall-clock time. One connection is shared by every thread
+    behind a lock; calls are meant to run off the event loop.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS captions ("
+                " shortcode TEXT PRIMARY KEY,"
+                " caption TEXT,"
+                " unavailable INTEGER NOT NULL DEFAULT 0,"
+                " reason TEXT NOT NULL DEFAULT '',"
+                " fetched_at REAL NOT NULL,"
+                " expires_at REAL NOT NULL)"
+            )
+
+    def get(self, shortcode: str) -> Optional[Tuple[CachedCaption, float]]:
+        """Return (entry, expires_at) for an unexpired row, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT caption, unavailable, reason, fetched_at, expires_at FROM captions WHERE shortcode = ?",
+                (shortcode,),
+            ).fetchone()
+        if row is None or row[4] <= time.time():
+            return None
+        caption, unavailable, reason, fetched_at, expires_at = row
+        return CachedCaption(caption, bool(unavailable), reason, fetched_at), expires_at
+
+    def set(self, shortcode: str, entry: CachedCaption, expires_at: float):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO captions (shortcode, caption, unavailable, reason, fetched_at, expires_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (shortcode, entry.caption, int(entry.unavailable), entry.reason, entry.fetched_at, expires_at),
+            )
+
+    def purge(self, shortcode: Optional[str] = None, unavailable_only: bool = False, expired_only: bool = False) -> int:
+        """Delete matching rows (every row with no filters) and return how many were removed."""
+        clauses, params = [], []
+        if shortcode is not None:
+            clauses.append("shortcode = ?")
+            params.append(shortcode)
+        if unavailable_only:
+            clauses.append("unavailable = 1")
+        if expired_only:
+            clauses.append("expires_at <= ?")
+            params.append(time.time())
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        with self._lock, self._conn:
+            return self._conn.execute(f"DELETE FROM captions{where}", params).rowcount
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM captions").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class CaptionCache:
+    """
+    Two-tier caption cache keyed by shortcode: an in-memory LRU in front of a `CaptionStore`.
+
+    Memory hits never leave the event loop; memory misses read the store in a
+    thread and promote what they find. Posts that could not be fetched are
+    cached too, for `negative_ttl_seconds`, so deleted or private posts don't
+    hit Instagram on every request.
+    """
+
+    def __init__(self, path: str, max_entries: int = 10000, ttl_seconds: float = 7 * 24 * 3600, negative_ttl_seconds: float = 3600):
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.lru = LRUCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self.store = CaptionStore(path)
+
+        self.store_hits = 0
+        self.store_misses = 0
+
+    async def get(self, shortcode: str) -> Optional[CachedCaption]:
+        entry = self.lru.get(shortcode)
+        if entry is not None:
+            return entry
+
+        found = await asyncio.to_thread(self.store.get, shortcode)
+        if found is None:
+            self.store_misses += 1
+            return None
+
+        self.store_hits += 1
+        entry, expires_at = found
+        self.lru.set(shortcode, entry, ttl_seconds=expires_at - time.time())
+        return entry
+
+    async def set_caption(self, shortcode: str, caption: Optional[str]) -> CachedCaption:
+        return await self._set(shortcode, CachedCaption(caption, fetched_at=time.time()), self.ttl_seconds)
+
+    async def set_unavailable(self, shortcode: str, reason: str) -> CachedCaption:
+        entry = CachedCaption(None, unavailable=True, reason=reason, fetched_at=time.time())
+        return await self._set(shortcode, entry, self.negative_ttl_seconds)
+
+    async def _set(self, shortcode: str, entry: CachedCaption, ttl_seconds: float) -> CachedCaption:
+        self.lru.set(shortcode, entry, ttl_seconds=ttl_seconds)
+        try:
+            await asyncio.to_thread(self.store.set, shortcode, entry, entry.fetched_at + ttl_seconds)
+        except sqlite3.Error:
+            logger.exception(f"Failed to persist caption for {shortcode}")
+        return entry
+
+    async def purge(self, shortcode: Optional[str] = None, unavailable_only: bool = False, expired_only: bool = False) -> int:
+        """Remove matching entries from both tiers and return how many stored entries were removed."""
+        # expired memory entries are already dropped on lookup
+        if not expired_only:
+            self.lru.pop_where(
+                lambda key, entry: (shortcode is None or key == shortcode) and (entry.unavailable or not unavailable_only)
+            )
+
+        return await asyncio.to_thread(self.store.purge, shortcode, unavailable_only, expired_only)
+
+    def close(self):
+        self.store.close()
+
+    def stats(self) -> dict:
+        lookups = self.store_hits + self.store_misses
+        return {
+            "memory": self.lru.stats(),
+            "store_path": self.store.path,
+            "store_hits": self.store_hits,
+            "store_misses": self.store_misses,
+            "store_hit_rate": round((self.store_hits / lookups) * 100, 2) if lookups else 0,
+            "negative_ttl_seconds": self.negative_ttl_seconds,
+        }
+
+
+__all__ = ['LRUCache', 'SingleFlight', 'SentimentCache', 'CachedCaption', 'CaptionStore', 'CaptionCache']
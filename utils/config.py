@@ -5,5 +5,70 @@ class Config:
 
    model_dir: str = 'models'
    model_name: str = "cardiffnlp/twitter-roberta-base-sentiment-latest"
-    
-    
+
+   # inference backend: "torch" (eager), "onnx" (ONNX Runtime, CPU) or "torchscript"
+   backend: str = "torch"
+
+   # "fp32" or "bf16" (torch backend only); bf16 falls back to fp32 on hardware without native support
+   precision: str = "fp32"
+
+   # CPU only: serve a dynamically int8-quantized copy of the torch model if it
+   # matches fp32 on assets/sentiment_samples.txt (label agreement %, max confidence delta)
+   quantize_int8: bool = False
+   int8_min_label_agreement: float = 95.0
+   int8_max_confidence_delta: float = 0.1
+
+   # dynamic micro-batching in front of the worker pool
+   max_batch_size: int = 16
+   max_batch_wait_ms: float = 5.0
+
+   # adaptive batching: retune max_batch_size / max_batch_wait_ms every autotune_interval_s,
+   # within these bounds, to keep p95 batch latency under autotune_p95_target_ms
+   autotune_batching: bool = False
+   autotune_p95_target_ms: float = 100
+   autotune_min_batch_size: int = 1
+   autotune_max_batch_size: int = 64
+   autotune_min_wait_ms: float = 0.0
+   autotune_max_wait_ms: float = 20.0
+   autotune_interval_s: float = 5.0
+
+   # admission control: requests beyond max_queue_depth, or that can't start within
+   # request_deadline_ms, get a 503 with Retry-After
+   max_queue_depth: int = 256
+   request_deadline_ms: float = 10000
+   retry_after_s: int = 1
+
+   # bucket size for /service/sentiment/batch (texts are length-sorted before padding)
+   bucket_size: int = 32
+
+   # chunked long-text mode: overlapping token windows, at most this many per request
+   long_text_stride: int = 128
+   long_text_max_chunks: int = 8
+
+   # sentiment result cache (0 entries disables it)
+   cache_max_entries: int = 10000
+   cache_ttl_seconds: float = 3600
+
+   # CPU only: more than one worker starts one process per worker sharing the model weights.
+   # 0 plans the worker count from the visible cores and cgroup CPU quota (and cpu_threads_per_worker when set)
+   cpu_workers: int = 1
+   cpu_threads_per_worker: int = 0  # 0 splits the usable cores evenly between workers
+   cpu_interop_threads: int = 1
+   cpu_pin_workers: bool = True  # pin worker processes to disjoint cores, NUMA node by node
+
+   # warmup: synthetic batches run on every worker before the pool reports ready
+   warmup_seq_lengths: tuple = (16, 64, 128, 512)
+   warmup_batch_sizes: tuple = (1, 16)
+   compile_model: bool = False  # torch.compile the torch backend during warmup
+
+   # long-lived InstaScrapper instances shared by the caption endpoints
+   scrapper_pool_size: int = 2
+   # blocking Instagram fetches run on their own bounded thread pool
+   scrapper_max_concurrency: int = 4
+   scrapper_timeout_s: float = 15.0  # per call, including the wait for a free scrapper
+
+   # Instagram caption cache: in-memory LRU in front of a SQLite file
+   caption_cache_path: str = 'cache/captions.sqlite3'  # relative to the working directory, git- and docker-ignored
+   caption_cache_max_entries: int = 10000
+   caption_cache_ttl_seconds: float = 7 * 24 * 3600
+   caption_cache_negative_ttl_seconds: float = 3600  # deleted or private posts
@@ -1,5 +1,10 @@
+import os
+import glob
+import math
 import torch
 import logging
+from dataclasses import dataclass, asdict
+from typing import List, Optional
 
 
 logger = logging.getLogger(__name__)
@@ -14,10 +19,201 @@ def autodetect_device():
         
     logger.info(f"Autodetected device type as {device_type}")
     return device_type
+
+
+PRECISIONS = ("fp32", "bf16")
+
+
+# cpuinfo flags for native bf16 matmul: AVX512-BF16 / AMX on x86, BF16 on Arm
+BF16_CPU_FLAGS = {"avx512_bf16", "amx_bf16", "bf16"}
+
+
+def _cpuinfo_flags() -> Optional[set]:
+    """CPU feature flags from /proc/cpuinfo ("flags" on x86, "Features" on Arm), or None if unavailable."""
+    try:
+        with open("/proc/cpuinfo") as f:
+            lines = f.readlines()
+    except OSError:
+        return None
+
+    flags = set()
+    for line in lines:
+        key, _, value = line.partition(":")
+        if key.strip() in ("flags", "Features"):
+            flags.update(value.split())
+    return flags or None
+
+
+def cpu_supports_bf16() -> bool:
+    """
+    True when this CPU has native bf16 matmul (AVX512-BF16 / AMX on x86, BF16 on Arm).
+
+    The CPU flags decide when they can be read. oneDNN's own probe only
+    backs them up: it also reports bf16 on plain AVX512 CPUs (Skylake,
+    Cascade Lake), where bf16 is emulated and slower than fp32.
+    """
+    flags = _cpuinfo_flags()
+    if flags is not None:
+        return bool(flags & BF16_CPU_FLAGS)
+
+    try:
+        return bool(torch.ops.mkldnn._is_mkldnn_bf16_supported())
+    except (AttributeError, RuntimeError):
+        return False
+
+
+def resolve_precision(device_type: str, requested: str) -> str:
+    """Return the precision to run in on `device_type`: `requested` if the hardware supports it, else fp32."""
+    if requested not in PRECISIONS:
+        raise ValueError(f"Unsupported precision: {requested}. Must be one of: {', '.join(PRECISIONS)}")
+    if requested == "fp32":
+        return "fp32"
+
+    if device_type == "cpu":
+        supported = cpu_supports_bf16()
+    elif device_type == "cuda":
+        supported = torch.cuda.is_bf16_supported()
+    else:
+        supported = False
+
+    if not supported:
+        logger.warning(f"bf16 is not supported on this {device_type}, running in fp32")
+        return "fp32"
+    return "bf16"
+
+
+# threads per CPU worker when the worker count is planned automatically; past
+# this, a transformer forward pass gains little from more intra-op threads
+AUTO_THREADS_PER_WORKER = 4
+
+
+@dataclass
+class CpuPlan:
+    """How CPU inference workers are laid out over the cores this process may use."""
+    visible_cpus: List[int]
+    cgroup_cpu_limit: Optional[float]
+    numa_nodes: List[List[int]]
+    usable_cores: int
+    workers: int
+    intra_op_threads: int
+    interop_threads: int
+    # cores each worker process is pinned to, None when workers are not pinned
+    pinning: Optional[List[List[int]]]
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def visible_cpus() -> List[int]:
+    """CPUs this process is allowed to run on (affinity mask, e.g. from taskset or cpusets)."""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def cgroup_cpu_limit() -> Optional[float]:
+    """CPU quota of the enclosing cgroup in cores (e.g. a container's --cpus), or None if unlimited."""
+    try:
+        # cgroup v2: "<quota> <period>" or "max <period>"
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota == "max":
+            return None
+        return int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+
+    try:
+        # cgroup v1
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as f:
+            quota = int(f.read())
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as f:
+            period = int(f.read())
+        return quota / period if quota > 0 else None
+    except (OSError, ValueError):
+        return None
+
+
+def _parse_cpulist(cpulist: str) -> List[int]:
+    cpus = []
+    for part in cpulist.strip().split(","):
+        if not part:
+            continue
+        if "-" in part:
+            first, last = part.split("-")
+            cpus.extend(range(int(first), int(last) + 1))
+        else:
+            cpus.append(int(part))
+    return cpus
+
+
+def numa_nodes(cpus: List[int]) -> List[List[int]]:
+    """Group `cpus` by NUMA node (a single group when the topology is unknown)."""
+    allowed = set(cpus)
+    nodes = []
+    for path in sorted(glob.glob("/sys/devices/system/node/node[0-9]*/cpulist")):
+        try:
+            with open(path) as f:
+                node = [cpu for cpu in _parse_cpulist(f.read()) if cpu in allowed]
+        except (OSError, ValueError):
+            continue
+        if node:
+            nodes.append(node)
+    return nodes or [list(cpus)]
+
+
+def plan_cpu_workers(workers: int = 0, threads_per_worker: int = 0, interop_threads: int = 1, pin: bool = True) -> CpuPlan:
+    """
+    Plan CPU workers so their threads fit the cores this process can actually use.
+
+    Usable cores are the visible CPUs, capped by the cgroup CPU quota. `workers`
+    and `threads_per_worker` override the planned values when non-zero. When
+    only `threads_per_worker` is set, as many workers as fit the usable cores
+    are planned; otherwise workers get `AUTO_THREADS_PER_WORKER` cores each and
+    the cores are split evenly between them. Workers are pinned to disjoint
+    sets of cores, filled NUMA node by node, unless that would oversubscribe them.
+    """
+    cpus = visible_cpus()
+    limit = cgroup_cpu_limit()
+    usable = len(cpus) if limit is None else max(1, min(len(cpus), math.floor(limit)))
+    nodes = numa_nodes(cpus)
+
+    if workers <= 0:
+        workers = max(1, usable // (threads_per_worker or AUTO_THREADS_PER_WORKER))
+    threads = threads_per_worker or max(1, usable // workers)
+
+    pinning = None
+    if pin and workers > 1 and workers * threads <= len(cpus):
+        ordered = [cpu for node in nodes for cpu in node]
+        pinning = [ordered[i * threads:(i + 1) * threads] for i in range(workers)]
+
+    return CpuPlan(
+        visible_cpus=cpus,
+        cgroup_cpu_limit=limit,
+        numa_nodes=nodes,
+        usable_cores=usable,
+        workers=workers,
+        intra_op_threads=threads,
+        interop_threads=interop_threads,
+        pinning=pinning,
+    )
+
+
+def apply_cpu_threads(intra_op_threads: int, interop_threads: int):
+    """Set torch's thread pools for this process (interop can only be set before any parallel work starts)."""
+    torch.set_num_threads(intra_op_threads)
+    if torch.get_num_interop_threads() == interop_threads:
+        return
+    try:
+        torch.set_num_interop_threads(interop_threads)
+    except RuntimeError:
+        logger.warning(f"torch interop threads already initialized, keeping {torch.get_num_interop_threads()}")
         
     
 if __name__ == "__main__":
     print(autodetect_device())
+    print(f"cpu bf16: {cpu_supports_bf16()}")
+    print(plan_cpu_workers())
     
     
-__all__ = ['autodetect_device']
\ No newline at end of file
+__all__ = ['autodetect_device', 'PRECISIONS', 'cpu_supports_bf16', 'resolve_precision', 'CpuPlan', 'plan_cpu_workers', 'apply_cpu_threads']
\ No newline at end of file
@@ -2,12 +2,12 @@
 Middleware for tracking endpoint response times and generating performance metrics.
 """
 import time
+import asyncio
 import logging
-from collections import defaultdict
+from collections import defaultdict, deque
 from datetime import datetime
-from typing import Dict, List
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
+from typing import Dict, List, Optional
+from starlette.datastructures import MutableHeaders
 
 
 logger = logging.getLogger(__name__)
@@ -23,6 +23,8 @@ class ResponseTimeTracker:
         # Structure: {endpoint: [(timestamp, response_time_ms, status_code), ...]}
         self.metrics: Dict[str, List[tuple]] = defaultdict(list)
         self.max_records_per_endpoint = 1000  # Prevent memory overflow
+        # Structure: {endpoint: number of requests abandoned because the client disconnected}
+        self.cancellations: Dict[str, int] = defaultdict(int)
     
     def record(self, endpoint: str, response_time_ms: float, status_code: int, timestamp: datetime = None):
         """Record a response time measurement."""
@@ -35,20 +37,25 @@ class ResponseTimeTracker:
         if len(self.metrics[endpoint]) > self.max_records_per_endpoint:
             self.metrics[endpoint] = self.metrics[endpoint][-self.max_records_per_endpoint:]
     
+    def record_cancellation(self, endpoint: str):
+        """Count a request whose work was cancelled because the client disconnected."""
+        self.cancellations[endpoint] += 1
+
     def get_stats(self, endpoint: str = None) -> dict:
         """
         Get statistics for an endpoint or all endpoints.
         
         Returns:
-            dict with keys: endpoint, count, avg_ms, min_ms, max_ms, p50_ms, p95_ms, p99_ms
+            dict with keys: endpoint, count, avg_ms, min_ms, max_ms, p50_ms, p95_ms, p99_ms, success_rate, cancelled
         """
         if endpoint:
             return self._calculate_stats(endpoint, self.metrics.get(endpoint, []))
         
         # Return stats for all endpoints
+        # endpoints whose only requests were cancelled have no latency samples
         all_stats = {}
-        for ep, data in self.metrics.items():
-            all_stats[ep] = self._calculate_stats(ep, data)
+        for ep in list(self.metrics) + [ep for ep in self.cancellations if ep not in self.metrics]:
+            all_stats[ep] = self._calculate_stats(ep, self.metrics.get(ep, []))
         return all_stats
     
     def _calculate_stats(self, endpoint: str, data: List[tuple]) -> dict:
@@ -64,6 +71,7 @@ class ResponseTimeTracker:
                 "p95_ms": 0,
                 "p99_ms": 0,
                 "success_rate": 0,
+                "cancelled": self.cancellations.get(endpoint, 0),
             }
         
         response_times = [rt for _, rt, _ in data]
@@ -91,6 +99,7 @@ class ResponseTimeTracker:
             "p95_ms": round(sorted_times[p95_idx], 2),
             "p99_ms": round(sorted_times[p99_idx], 2),
             "success_rate": round((successful / count) * 100, 2),
+            "cancelled": self.cancellations.get(endpoint, 0),
         }
     
     def get_time_series(self, endpoint: str) -> List[dict]:
@@ -109,53 +118,239 @@ class ResponseTimeTracker:
         """Clear metrics for a specific endpoint or all endpoints."""
         if endpoint:
             self.metrics.pop(endpoint, None)
+            self.cancellations.pop(endpoint, None)
         else:
             self.metrics.clear()
+            self.cancellations.clear()
+
+
+class EventLoopMonitor:
+    """
+    Measures how long the asyncio event loop is blocked.
+
+    A background task sleeps for `interval` seconds and records how late it
+    wakes up. Any delay past the interval is time the loop spent running
+    code that did not yield (e.g. a forward pass inside a handler).
+    """
+
+    def __init__(self, interval: float = 0.1, max_records: int = 1000):
+        self.interval = interval
+        # Structure: [(timestamp, lag_ms), ...]
+        self.lags: deque = deque(maxlen=max_records)
+        self.max_lag_ms = 0.0
+        self.total_blocked_ms = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            lag_ms = max(0.0, (loop.time() - start - self.interval) * 1000)
+
+            self.lags.append((datetime.now(), lag_ms))
+            self.total_blocked_ms += lag_ms
+            self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+
+            if lag_ms > 100:
+                logger.warning(f"Event loop was blocked for {lag_ms:.2f}ms")
+
+    def get_stats(self) -> dict:
+        """
+        Get event loop lag statistics over the recorded window.
+
+        Returns:
+            dict with keys: samples, avg_lag_ms, p95_lag_ms, p99_lag_ms, max_lag_ms, total_blocked_ms
+        """
+        if not self.lags:
+            return {
+                "samples": 0,
+                "avg_lag_ms": 0,
+                "p95_lag_ms": 0,
+                "p99_lag_ms": 0,
+                "max_lag_ms": 0,
+                "total_blocked_ms": 0,
+            }
 
+        sorted_lags = sorted(lag for _, lag in self.lags)
+        count = len(sorted_lags)
 
-class ResponseTimeMiddleware(BaseHTTPMiddleware):
+        return {
+            "samples": count,
+            "avg_lag_ms": round(sum(sorted_lags) / count, 2),
+            "p95_lag_ms": round(sorted_lags[int(count * 0.95)], 2),
+            "p99_lag_ms": round(sorted_lags[int(count * 0.99)], 2),
+            "max_lag_ms": round(self.max_lag_ms, 2),
+            "total_blocked_ms": round(self.total_blocked_ms, 2),
+        }
+
+
+class InferenceTelemetry:
+    """
+    Tracks where inference time goes: per-stage latency (request validation,
+    queue wait, tokenize, forward, post-process) and per-worker load (busy time, requests served,
+    batch-size and sequence-length histograms).
+    """
+
+    STAGES = ("validate", "queue_wait", "tokenize", "forward", "postprocess")
+    BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64)
+    SEQ_LENGTH_BUCKETS = (16, 32, 64, 128, 256, 512)
+
+    def __init__(self, max_records: int = 1000):
+        self.started_at = time.monotonic()
+        # Structure: {stage: deque of durations in ms}
+        self.stages: Dict[str, deque] = {stage: deque(maxlen=max_records) for stage in self.STAGES}
+        # Structure: {worker_id: {"requests", "batches", "busy_ms", "batch_sizes", "seq_lengths"}}
+        self.workers: Dict[str, dict] = {}
+
+    def _worker(self, worker_id) -> dict:
+        key = str(worker_id)
+        if key not in self.workers:
+            self.workers[key] = {
+                "requests": 0,
+                "batches": 0,
+                "busy_ms": 0.0,
+                "batch_sizes": defaultdict(int),
+                "seq_lengths": defaultdict(int),
+            }
+        return self.workers[key]
+
+    @staticmethod
+    def _bucket(value: int, buckets: tuple) -> str:
+        for bound in buckets:
+            if value <= bound:
+                return f"<={bound}"
+        return f">{buckets[-1]}"
+
+    def record_stage(self, stage: str, duration_ms: float):
+        self.stages[stage].append(duration_ms)
+
+    def record_queue_wait(self, wait_ms: float):
+        self.record_stage("queue_wait", wait_ms)
+
+    def record_batch(self, worker_id, num_requests: int, busy_ms: float, timings: dict):
+        """
+        Record one call served by a worker.
+
+        `timings` is what the worker reported: tokenize_ms, forward_ms,
+        postprocess_ms and the (batch_size, seq_length) of each forward pass.
+        """
+        for stage in ("tokenize", "forward", "postprocess"):
+            self.record_stage(stage, timings.get(f"{stage}_ms", 0.0))
+
+        worker = self._worker(worker_id)
+        worker["requests"] += num_requests
+        worker["batches"] += 1
+        worker["busy_ms"] += busy_ms
+        for batch_size, seq_length in timings.get("forwards", []):
+            worker["batch_sizes"][self._bucket(batch_size, self.BATCH_SIZE_BUCKETS)] += 1
+            worker["seq_lengths"][self._bucket(seq_length, self.SEQ_LENGTH_BUCKETS)] += 1
+
+    def get_stats(self) -> dict:
+        """
+        Get stage latency and per-worker load statistics.
+
+        Returns:
+            dict with keys: stages ({stage: count, avg_ms, p50_ms, p95_ms, p99_ms})
+            and workers ({worker_id: requests, batches, busy_ms, utilization,
+            avg_batch_size, batch_sizes, seq_lengths})
+        """
+        uptime_ms = (time.monotonic() - self.started_at) * 1000
+
+        stages = {}
+        for stage, durations in self.stages.items():
+            sorted_durations = sorted(durations)
+            count = len(sorted_durations)
+            if not count:
+                stages[stage] = {"count": 0, "avg_ms": 0, "p50_ms": 0, "p95_ms": 0, "p99_ms": 0}
+                continue
+            stages[stage] = {
+                "count": count,
+                "avg_ms": round(sum(sorted_durations) / count, 2),
+                "p50_ms": round(sorted_durations[int(count * 0.50)], 2),
+                "p95_ms": round(sorted_durations[int(count * 0.95)], 2),
+                "p99_ms": round(sorted_durations[int(count * 0.99)], 2),
+            }
+
+        workers = {}
+        for worker_id, worker in self.workers.items():
+            workers[worker_id] = {
+                "requests": worker["requests"],
+                "batches": worker["batches"],
+                "busy_ms": round(worker["busy_ms"], 2),
+                "utilization": round((worker["busy_ms"] / uptime_ms) * 100, 2) if uptime_ms else 0,
+                "avg_batch_size": round(worker["requests"] / worker["batches"], 2) if worker["batches"] else 0,
+                "batch_sizes": {b: worker["batch_sizes"][b] for b in self._bucket_labels(self.BATCH_SIZE_BUCKETS)},
+                "seq_lengths": {b: worker["seq_lengths"][b] for b in self._bucket_labels(self.SEQ_LENGTH_BUCKETS)},
+            }
+
+        return {"stages": stages, "workers": workers}
+
+    @staticmethod
+    def _bucket_labels(buckets: tuple) -> List[str]:
+        return [f"<={bound}" for bound in buckets] + [f">{buckets[-1]}"]
+
+
+class ResponseTimeMiddleware:
     """
     FastAPI middleware to automatically track response times for all endpoints.
+
+    Written as plain ASGI middleware rather than `BaseHTTPMiddleware`: that
+    one hands the route a receive channel whose body was already consumed,
+    so `request.is_disconnected()` never sees the client go away.
     """
-    
+
+    # Skip tracking for static files and health checks
+    skip_paths = ("/docs", "/redoc", "/openapi.json", "/favicon.ico", "/metrics", "/internal")
+
     def __init__(self, app, tracker: ResponseTimeTracker):
-        super().__init__(app)
+        self.app = app
         self.tracker = tracker
-    
-    async def dispatch(self, request: Request, call_next):
-        # Skip tracking for static files and health checks if desired
-        path = request.url.path
-        
-        # Skip these paths
-        skip_paths = ["/docs", "/redoc", "/openapi.json", "/favicon.ico", "/metrics", "/internal"]
-        if any(path.startswith(skip) for skip in skip_paths):
-            return await call_next(request)
-        
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        path = scope["path"]
+        method = scope["method"]
+
         # Skip OPTIONS requests (CORS preflight - not actual API calls)
-        if request.method == "OPTIONS":
-            return await call_next(request)
-        
+        if path.startswith(self.skip_paths) or method == "OPTIONS":
+            return await self.app(scope, receive, send)
+
         # Start timer
         start_time = time.perf_counter()
-        
-        # Process request
-        response = await call_next(request)
-        
-        # Calculate response time
-        end_time = time.perf_counter()
-        response_time_ms = (end_time - start_time) * 1000
-        
         # Create endpoint identifier (method + path)
-        endpoint = f"{request.method} {path}"
-        
-        # Record metrics
-        self.tracker.record(endpoint, response_time_ms, response.status_code)
-        
-        # Add response time header
-        response.headers["X-Response-Time"] = f"{response_time_ms:.2f}ms"
-        
-        # Log slow requests (> 1 second)
-        if response_time_ms > 1000:
-            logger.warning(f"Slow request: {endpoint} took {response_time_ms:.2f}ms")
-        
-        return response
+        endpoint = f"{method} {path}"
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                response_time_ms = (time.perf_counter() - start_time) * 1000
+
+                # Record metrics
+                self.tracker.record(endpoint, response_time_ms, message["status"])
+
+                # Add response time header
+                headers = MutableHeaders(scope=message)
+                headers.append("X-Response-Time", f"{response_time_ms:.2f}ms")
+
+                # Log slow requests (> 1 second)
+                if response_time_ms > 1000:
+                    logger.warning(f"Slow request: {endpoint} took {response_time_ms:.2f}ms")
+
+            await send(message)
+
+        await self.app(scope, receive, send_with_timing)
@@ -1,7 +1,12 @@
+import os
 import re
 import html
 import string
-from typing import Iterable, List
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
+from itertools import islice
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple, Union
 
 _URL_RE = re.compile(r"https?://\S+|www\.\S+", flags=re.IGNORECASE)
 _HTML_TAG_RE = re.compile(r"<[^>]+>")
@@ -25,6 +30,161 @@ _MULTI_WS_RE = re.compile(r"\s+")
 _MULTI_NEWLINE_RE = re.compile(r"\n\s*\n+")
 
 
+_WORD_RE = re.compile(r"\w+")
+
+# hashtag symbols and emojis as character-class bodies, so deletions can share one pass
+_HASHTAG_CHARS = "#"
+_EMOJI_CHARS = _EMOJI_RE.pattern[1:-1]
+_PUNCTUATION_TABLE = str.maketrans("", "", string.punctuation)
+
+
+class CleaningPipeline:
+    """Text cleaning compiled once from a set of `clean_text` options.
+
+    The enabled steps run in the same order as `clean_text` documents, with
+    compatible steps fused so each text is scanned fewer times:
+
+    - hashtag symbol, emoji and punctuation removal are all single-character
+      deletions and run as one character-class pass
+    - newline normalization is skipped when whitespace normalization is on,
+      since collapsing all whitespace subsumes it; whitespace is collapsed
+      with `str.split` rather than a regex
+    - preserved words are found with one compiled alternation and only the
+      text between them is lowercased
+
+    URL and mention removal stay separate passes: a mention directly in front
+    of a URL would match differently as one alternation.
+
+    Example:
+        >>> pipeline = CleaningPipeline(remove_urls=True, normalize_whitespace=True)
+        >>> pipeline("Visit   https://example.com now")
+        'Visit now'
+    """
+
+    def __init__(
+        self,
+        lower: bool = False,
+        strip_html: bool = False,
+        remove_urls: bool = False,
+        remove_mentions: bool = False,
+        remove_hashtag_symbol: bool = False,
+        remove_emojis: bool = False,
+        remove_punctuation: bool = False,
+        normalize_newlines: bool = False,
+        normalize_whitespace: bool = False,
+        preserve_case_words: Iterable[str] = (),
+    ):
+        self.steps: List[Tuple[str, Callable[[str], str]]] = []
+
+        if strip_html:
+            self.steps.append(("strip_html", self._strip_html))
+
+        if remove_urls:
+            self.steps.append(("remove_urls", partial(_URL_RE.sub, " ")))
+
+        if remove_mentions:
+            self.steps.append(("remove_mentions", partial(_MENTION_RE.sub, " ")))
+
+        deleted = []
+        if remove_hashtag_symbol:
+            deleted.append(("remove_hashtag_symbol", _HASHTAG_CHARS))
+        if remove_emojis:
+            deleted.append(("remove_emojis", _EMOJI_CHARS))
+        if remove_punctuation:
+            deleted.append(("remove_punctuation", re.escape(string.punctuation)))
+
+        if [name for name, _ in deleted] == ["remove_punctuation"]:
+            self.steps.append(("remove_punctuation", self._remove_punctuation))
+        elif deleted:
+            chars_re = re.compile("[" + "".join(chars for _, chars in deleted) + "]", flags=re.UNICODE)
+            self.steps.append(("+".join(name for name, _ in deleted), partial(chars_re.sub, "")))
+
+        if normalize_newlines and not normalize_whitespace:
+            self.steps.append(("normalize_newlines", partial(_MULTI_NEWLINE_RE.sub, "\n")))
+
+        if normalize_whitespace:
+            self.steps.append(("normalize_whitespace", self._normalize_whitespace))
+
+        if lower:
+            # dict.fromkeys keeps the first occurrence, as sequential replacement would
+            words = list(dict.fromkeys(preserve_case_words))
+            if not words:
+                self.steps.append(("lower", str.lower))
+            elif all(_WORD_RE.fullmatch(w) for w in words):
+                # distinct single-token words can never overlap, so one alternation finds
+                # exactly what replacing them one at a time would
+                self._preserve_re = re.compile(r"\b(?:" + "|".join(map(re.escape, words)) + r")\b")
+                self.steps.append(("lower", self._lower_preserving))
+            else:
+                self._preserve_res = [re.compile(rf"\b{re.escape(w)}\b") for w in words]
+                self._preserve_words = words
+                self.steps.append(("lower", self._lower_preserving_sequential))
+
+    def __call__(self, text: str) -> str:
+        if not text:
+            return ""
+
+        text = str(text)
+        for _, step in self.steps:
+            text = step(text)
+        return text
+
+    def clean_many(self, texts: Iterable[str]) -> List[str]:
+        return [self(t) for t in texts]
+
+    def describe(self) -> List[str]:
+        """Names of the passes this pipeline runs, in order."""
+        return [name for name, _ in self.steps]
+
+    @staticmethod
+    def _strip_html(text: str) -> str:
+        return html.unescape(_HTML_TAG_RE.sub(" ", text))
+
+    @staticmethod
+    def _remove_punctuation(text: str) -> str:
+        return text.translate(_PUNCTUATION_TABLE)
+
+    @staticmethod
+    def _normalize_whitespace(text: str) -> str:
+        # str.split() splits on exactly the characters `\s` matches, without the regex engine
+        return " ".join(text.split())
+
+    def _lower_preserving(self, text: str) -> str:
+        parts = []
+        last = 0
+        for match in self._preserve_re.finditer(text):
+            parts.append(text[last:match.start()].lower())
+            parts.append(match.group())
+            last = match.end()
+        parts.append(text[last:].lower())
+        return "".join(parts)
+
+    def _lower_preserving_sequential(self, text: str) -> str:
+        # placeholders must survive str.lower(), so they contain no letters
+        placeholders = {}
+        for i, (pattern, w) in enumerate(zip(self._preserve_res, self._preserve_words)):
+            key = f"\x00{i}\x00"
+            placeholders[key] = w
+            text = pattern.sub(key, text)
+
+        text = text.lower()
+
+        for key, w in placeholders.items():
+            text = text.replace(key, w)
+        return text
+
+
+@lru_cache(maxsize=64)
+def _cached_pipeline(**options) -> CleaningPipeline:
+    return CleaningPipeline(**options)
+
+
+def get_pipeline(**options) -> CleaningPipeline:
+    """Return a shared `CleaningPipeline` for these `clean_text` options, building it on first use."""
+    options["preserve_case_words"] = tuple(options.get("preserve_case_words", ()))
+    return _cached_pipeline(**options)
+
+
 def clean_text(
     text: str,
     lower: bool = False,
@@ -49,8 +209,11 @@ def clean_text(
         remove_hashtag_symbol: Remove the leading '#' from hashtags but keep the word.
         remove_emojis: Remove emoji characters.
         remove_punctuation: Strip ASCII punctuation characters.
-            normalize_newlines: Collapse repeated blank lines to a single newline.
-            normalize_whitespace: Collapse repeated whitespace to single spaces and trim.
+        normalize_newlines: Collapse repeated blank lines to a single newline.
+            If `normalize_whitespace=True` is also set it replaces newlines with
+            spaces, so set `normalize_whitespace=False` to preserve newlines.
+        normalize_whitespace: Collapse repeated whitespace to single spaces and trim.
+        preserve_case_words: Words kept in their original case when `lower` is set.
 
     Returns:
         Cleaned string.
@@ -59,63 +222,93 @@ def clean_text(
         - This function intentionally avoids heavy NLP dependencies. For
           lemmatization or stopword removal, integrate with spaCy or NLTK
           outside this utility.
+        - The compiled `CleaningPipeline` for each combination of options is
+          cached, so repeated calls only pay for the cleaning passes.
     """
     if not text:
         return ""
 
-    text = str(text)
+    return get_pipeline(
+        lower=lower,
+        strip_html=strip_html,
+        remove_urls=remove_urls,
+        remove_mentions=remove_mentions,
+        remove_hashtag_symbol=remove_hashtag_symbol,
+        remove_emojis=remove_emojis,
+        remove_punctuation=remove_punctuation,
+        normalize_newlines=normalize_newlines,
+        normalize_whitespace=normalize_whitespace,
+        preserve_case_words=preserve_case_words,
+    )(text)
 
-    if strip_html:
-        text = _HTML_TAG_RE.sub(" ", text)
-        text = html.unescape(text)
 
-    if remove_urls:
-        text = _URL_RE.sub(" ", text)
+def clean_texts(texts: Iterable[str], **kwargs) -> List[str]:
+    """Clean an iterable of strings with one pipeline built from `kwargs` and return a list."""
+    return get_pipeline(**kwargs).clean_many(texts)
 
-    if remove_mentions:
-        text = _MENTION_RE.sub(" ", text)
 
-    if remove_hashtag_symbol:
-        text = _HASHTAG_RE.sub("", text)
+def iter_lines(path: Union[str, os.PathLike], encoding: str = "utf-8") -> Iterator[str]:
+    """Lazily yield the lines of a text file without their line endings."""
+    with open(path, encoding=encoding, errors="replace") as f:
+        for line in f:
+            yield line.rstrip("\r\n")
 
-    if remove_emojis:
-        text = _EMOJI_RE.sub("", text)
 
-    if remove_punctuation:
-        trans = str.maketrans("", "", string.punctuation)
-        text = text.translate(trans)
+def _chunks(texts: Iterable[str], size: int) -> Iterator[List[str]]:
+    it = iter(texts)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
 
-    if normalize_newlines:
-        # Collapse multiple consecutive newlines (and intervening whitespace)
-        # into a single newline. Note: if `normalize_whitespace=True` is set
-        # afterwards it will replace newlines with spaces, so set
-        # `normalize_whitespace=False` when you want to preserve newlines.
-        text = _MULTI_NEWLINE_RE.sub("\n", text)
 
-    if normalize_whitespace:
-        text = _MULTI_WS_RE.sub(" ", text).strip()
+def _clean_chunk(options: dict, chunk: List[str]) -> List[str]:
+    # runs in a pool process, which builds (and caches) its own pipeline
+    return get_pipeline(**options).clean_many(chunk)
 
-    if lower:
-        if preserve_case_words:
-            placeholders = {}
-            for i, w in enumerate(preserve_case_words):
-                key = f"__PRESERVE_{i}__"
-                placeholders[key] = w
-                text = re.sub(rf"\b{re.escape(w)}\b", key, text)
 
-            text = text.lower()
+def clean_stream(
+    source: Union[Iterable[str], str, os.PathLike],
+    processes: Optional[int] = None,
+    chunk_size: int = 1000,
+    max_in_flight: Optional[int] = None,
+    **kwargs,
+) -> Iterator[str]:
+    """Clean a stream of texts across a process pool, yielding results in input order.
 
-            for key, w in placeholders.items():
-                text = text.replace(key, w)
-        else:
-            text = text.lower()
+    Args:
+        source: An iterable of strings, or a path to a text file cleaned line by line.
+        processes: Worker processes (default: os.cpu_count()). 1 cleans in this process.
+        chunk_size: Texts sent to a worker at a time.
+        max_in_flight: Chunks submitted but not yet yielded (default: 2 per process).
+            Together with `chunk_size` this bounds memory, however long the input.
+        **kwargs: `clean_text` options.
+
+    Example:
+        >>> for line in clean_stream("assets/demo.txt", normalize_whitespace=True):
+        ...     print(line)
+    """
+    texts = iter_lines(source) if isinstance(source, (str, os.PathLike)) else source
+    kwargs["preserve_case_words"] = tuple(kwargs.get("preserve_case_words", ()))
+    processes = processes or os.cpu_count() or 1
 
-    return text
+    if processes == 1:
+        pipeline = get_pipeline(**kwargs)
+        for chunk in _chunks(texts, chunk_size):
+            yield from pipeline.clean_many(chunk)
+        return
 
+    max_in_flight = max_in_flight or processes * 2
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        pending = deque()
+        for chunk in _chunks(texts, chunk_size):
+            pending.append(pool.submit(_clean_chunk, kwargs, chunk))
+            if len(pending) >= max_in_flight:
+                yield from pending.popleft().result()
 
-def clean_texts(texts: Iterable[str], **kwargs) -> List[str]:
-    """Apply `clean_text` to an iterable of strings and return a list."""
-    return [clean_text(t, **kwargs) for t in texts]
+        while pending:
+            yield from pending.popleft().result()
 
 
 if __name__ == "__main__":
@@ -1,7 +1,99 @@
 import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterable, List, Optional
+from urllib.parse import urlparse
 
 
-def validate_caption(caption: str, max_length: int = 500, min_length: int = 1) -> tuple[bool, str]:
+_SPECIAL_CHAR_RE = re.compile(r'[^a-zA-Z0-9\s]')
+# same matches as r'(.)\1{10,}' (a character followed by 10 more copies), without the counted repeat
+_REPETITION_RE = re.compile(r'(.)' + r'\1' * 10)
+_EMOJI_RUN_RE = re.compile(
+    "[\U0001F600-\U0001F64F"  # emoticons
+    "\U0001F300-\U0001F5FF"  # symbols & pictographs
+    "\U0001F680-\U0001F6FF"  # transport & map symbols
+    "\U0001F1E0-\U0001F1FF"  # flags
+    "\U00002702-\U000027B0"
+    "\U000024C2-\U0001F251]+",
+    flags=re.UNICODE
+)
+# null byte plus every other control character except \n, \r and \t
+_CONTROL_CHAR_RE = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+class CaptionValidator:
+    """
+    Caption validation rules compiled once for a set of limits.
+
+    Checks run in a fixed order and the first failure is reported. All
+    patterns are module-level compiled regexes, and checks that cannot fail
+    for a caption are skipped: the emoji scan for ASCII-only captions, and
+    the word count when the caption is too short to hold `max_words` words.
+    """
+
+    def __init__(self, max_length: int = 500, min_length: int = 1, max_words: int = 200):
+        self.max_length = max_length
+        self.min_length = min_length
+        self.max_words = max_words
+        # a caption of n characters holds at most ceil(n / 2) words
+        self._max_length_without_word_check = 2 * max_words
+
+    def __call__(self, caption: str) -> tuple[bool, str]:
+        # 1. Check if caption is None or not a string
+        if caption is None:
+            return False, "Caption cannot be None"
+
+        if not isinstance(caption, str):
+            return False, "Caption must be a string"
+
+        # 2. Check empty/whitespace-only caption
+        if not caption.strip():
+            return False, "Caption cannot be empty or contain only whitespace"
+
+        # 3. Length validation
+        caption_length = len(caption)
+        if caption_length < self.min_length:
+            return False, f"Caption must be at least {self.min_length} character(s)"
+
+        if caption_length > self.max_length:
+            return False, f"Caption exceeds maximum length of {self.max_length} characters"
+
+        # 4. Check for excessive special characters (spam detection)
+        if len(_SPECIAL_CHAR_RE.findall(caption)) / caption_length > 0.5:  # More than 50% special chars
+            return False, "Caption contains too many special characters"
+
+        # 5. Check for excessive repetition (e.g., "hellooooooo")
+        if _REPETITION_RE.search(caption):
+            return False, "Caption contains excessive character repetition"
+
+        # 6. Check for excessive emoji/unicode (can affect sentiment models)
+        if not caption.isascii() and len(_EMOJI_RUN_RE.findall(caption)) > 50:
+            return False, "Caption contains too many emojis"
+
+        # 7. Check for null bytes or control characters
+        if _CONTROL_CHAR_RE.search(caption):
+            if '\x00' in caption:
+                return False, "Caption contains null bytes"
+            return False, "Caption contains invalid control characters"
+
+        # 8. Check word count (ensure meaningful content)
+        if caption_length > self._max_length_without_word_check and len(caption.split()) > self.max_words:
+            return False, f"Caption contains too many words (max {self.max_words})"
+
+        # All validations passed
+        return True, ""
+
+    def validate_many(self, captions: Iterable[str]) -> List[tuple[bool, str]]:
+        return [self(caption) for caption in captions]
+
+
+@lru_cache(maxsize=16)
+def get_caption_validator(max_length: int = 500, min_length: int = 1, max_words: int = 200) -> CaptionValidator:
+    """Return a shared `CaptionValidator` for these limits."""
+    return CaptionValidator(max_length=max_length, min_length=min_length, max_words=max_words)
+
+
+def validate_caption(caption: str, max_length: int = 500, min_length: int = 1, max_words: int = 200) -> tuple[bool, str]:
     """
     Validate caption text for sentiment analysis.
     
@@ -9,72 +101,22 @@ def validate_caption(caption: str, max_length: int = 500, min_length: int = 1) -
         caption: The caption text to validate
         max_length: Maximum allowed length (default: 500)
         min_length: Minimum required length (default: 1)
+        max_words: Maximum allowed number of words (default: 200)
     
     Returns:
         tuple: (is_valid, error_message)
     """
-    
-    # 1. Check if caption is None or not a string
-    if caption is None:
-        return False, "Caption cannot be None"
-    
-    if not isinstance(caption, str):
-        return False, "Caption must be a string"
-    
-    # 2. Check empty/whitespace-only caption
-    if not caption.strip():
-        return False, "Caption cannot be empty or contain only whitespace"
-    
-    # 3. Length validation
-    caption_length = len(caption)
-    if caption_length < min_length:
-        return False, f"Caption must be at least {min_length} character(s)"
-    
-    if caption_length > max_length:
-        return False, f"Caption exceeds maximum length of {max_length} characters"
-    
-    # 4. Check for excessive special characters (spam detection)
-    special_char_count = len(re.findall(r'[^a-zA-Z0-9\s]', caption))
-    if special_char_count / caption_length > 0.5:  # More than 50% special chars
-        return False, "Caption contains too many special characters"
-    
-    # 5. Check for excessive repetition (spam detection)
-    # Detect repeated characters (e.g., "hellooooooo")
-    if re.search(r'(.)\1{10,}', caption):
-        return False, "Caption contains excessive character repetition"
-    
-    # 6. Check for excessive emoji/unicode (optional, can affect sentiment models)
-    emoji_pattern = re.compile(
-        "[\U0001F600-\U0001F64F"  # emoticons
-        "\U0001F300-\U0001F5FF"  # symbols & pictographs
-        "\U0001F680-\U0001F6FF"  # transport & map symbols
-        "\U0001F1E0-\U0001F1FF"  # flags
-        "\U00002702-\U000027B0"
-        "\U000024C2-\U0001F251]+",
-        flags=re.UNICODE
-    )
-    emoji_count = len(emoji_pattern.findall(caption))
-    if emoji_count > 50:  # Adjust threshold as needed
-        return False, "Caption contains too many emojis"
-    
-    # 7. Check for null bytes or control characters
-    if '\x00' in caption:
-        return False, "Caption contains null bytes"
-    
-    control_chars = [c for c in caption if ord(c) < 32 and c not in '\n\r\t']
-    if len(control_chars) > 0:
-        return False, "Caption contains invalid control characters"
-    
-    # 8. Check word count (ensure meaningful content)
-    words = caption.split()
-    if len(words) > 200:  # Adjust based on model's token limit
-        return False, "Caption contains too many words (max 200)"
-    
-    # 9. Check for scripts that might cause encoding issues
-    # This is optional - depends on your model's training data
-    
-    # All validations passed
-    return True, ""
+    return get_caption_validator(max_length, min_length, max_words)(caption)
+
+
+def validate_captions(captions: Iterable[str], max_length: int = 500, min_length: int = 1, max_words: int = 200) -> List[tuple[bool, str]]:
+    """
+    Validate many captions with the same limits.
+
+    Returns:
+        list: one (is_valid, error_message) tuple per caption, in input order
+    """
+    return get_caption_validator(max_length, min_length, max_words).validate_many(captions)
 
 
 def validate_caption_for_sentiment(caption: str) -> tuple[bool, str]:
@@ -84,89 +126,172 @@ def validate_caption_for_sentiment(caption: str) -> tuple[bool, str]:
     return validate_caption(caption, max_length=500, min_length=1)
 
 
-def validate_post_url(url: str, platform: str = "instagram") -> tuple[bool, str]:
+def validate_captions_for_sentiment(captions: Iterable[str]) -> List[tuple[bool, str]]:
     """
-    Validate a social media post URL.
-    
+    Batch version of `validate_caption_for_sentiment`.
+    """
+    return validate_captions(captions, max_length=500, min_length=1)
+
+
+def validate_caption_for_long_sentiment(caption: str) -> tuple[bool, str]:
+    """
+    Caption validation for chunked (sliding-window) sentiment analysis,
+    which accepts long posts and comment threads.
+    """
+    return validate_caption(caption, max_length=5000, min_length=1, max_words=1000)
+
+
+_INSTAGRAM_DOMAINS = frozenset(("www.instagram.com", "instagram.com"))
+_INSTAGRAM_POST_TYPES = frozenset(("p", "reel", "tv"))
+_TWITTER_DOMAINS = frozenset(("www.twitter.com", "twitter.com", "x.com", "www.x.com"))
+_SHORTCODE_RE = re.compile(r'^[A-Za-z0-9_-]+$')
+
+
+@dataclass(frozen=True)
+class PostURL:
+    """A validated social media post URL."""
+    platform: str
+    # "p", "reel" or "tv" for Instagram, "status" for a tweet, None when unknown
+    post_type: Optional[str]
+    # Instagram shortcode or tweet id, None when the URL doesn't name one
+    shortcode: Optional[str]
+    # scheme, host and path normalized, query string and fragment dropped
+    canonical_url: str
+
+
+def classify_post_url(url: str, platform: str = "instagram") -> tuple[Optional[PostURL], str]:
+    """
+    Validate and canonicalize a social media post URL in one parse.
+
     Args:
-        url: The URL to validate
+        url: The URL to classify
         platform: The platform to validate against ("instagram", "twitter", etc.)
-    
+
     Returns:
-        tuple: (is_valid, error_message)
+        tuple: (post_url, error_message), post_url is None when the URL is invalid
     """
-    from urllib.parse import urlparse
-    
     # 1. Check if URL is None or empty
     if not url:
-        return False, "URL cannot be empty"
-    
+        return None, "URL cannot be empty"
+
     if not isinstance(url, str):
-        return False, "URL must be a string"
-    
-    url = url.strip()
-    
+        return None, "URL must be a string"
+
+    return _classify_post_url(url.strip(), platform.lower())
+
+
+@lru_cache(maxsize=4096)
+def _classify_post_url(url: str, platform: str) -> tuple[Optional[PostURL], str]:
     # 2. Basic URL format validation
     if not url.startswith(("http://", "https://")):
-        return False, "URL must start with http:// or https://"
-    
+        return None, "URL must start with http:// or https://"
+
     # 3. Parse the URL
     try:
         parsed = urlparse(url)
     except Exception as e:
-        return False, f"Invalid URL format: {str(e)}"
-    
+        return None, f"Invalid URL format: {str(e)}"
+
     # 4. Validate domain based on platform
-    if platform.lower() == "instagram":
-        valid_domains = ["www.instagram.com", "instagram.com"]
-        if parsed.netloc.lower() not in valid_domains:
-            return False, f"URL must be from Instagram (got: {parsed.netloc})"
-        
+    if platform == "instagram":
+        if parsed.netloc.lower() not in _INSTAGRAM_DOMAINS:
+            return None, f"URL must be from Instagram (got: {parsed.netloc})"
+
         # 5. Validate Instagram post path and extract shortcode
         path = parsed.path.strip("/")
-        
+
         # Check if path is empty (just domain)
         if not path:
-            return False, "Instagram URL must contain a post path (e.g., /p/shortcode/ or /reel/shortcode/)"
-        
+            return None, "Instagram URL must contain a post path (e.g., /p/shortcode/ or /reel/shortcode/)"
+
         # Instagram post patterns: /p/shortcode/, /reel/shortcode/, /tv/shortcode/
         path_parts = path.split("/")
-        
+
         if len(path_parts) < 2:
-            return False, "Invalid Instagram post URL format"
-        
+            return None, "Invalid Instagram post URL format"
+
         post_type = path_parts[0]
-        valid_post_types = ["p", "reel", "tv"]
-        
-        if post_type not in valid_post_types:
-            return False, f"Instagram URL must be a post (/p/), reel (/reel/), or IGTV (/tv/). Got: /{post_type}/"
-        
-        shortcode = path_parts[1] if len(path_parts) > 1 else ""
-        
+        if post_type not in _INSTAGRAM_POST_TYPES:
+            return None, f"Instagram URL must be a post (/p/), reel (/reel/), or IGTV (/tv/). Got: /{post_type}/"
+
+        shortcode = path_parts[1]
+
         # Validate shortcode is not empty and has reasonable length
         if not shortcode:
-            return False, "Instagram post URL must contain a valid shortcode"
-        
+            return None, "Instagram post URL must contain a valid shortcode"
+
         # Instagram shortcodes are typically 11 characters (alphanumeric, underscore, dash)
         if len(shortcode) < 5 or len(shortcode) > 20:
-            return False, f"Invalid Instagram shortcode length: {len(shortcode)} characters"
-        
-        if not re.match(r'^[A-Za-z0-9_-]+$', shortcode):
-            return False, "Instagram shortcode contains invalid characters"
-    
-    elif platform.lower() == "twitter":
-        valid_domains = ["www.twitter.com", "twitter.com", "x.com", "www.x.com"]
-        if parsed.netloc.lower() not in valid_domains:
-            return False, f"URL must be from Twitter/X (got: {parsed.netloc})"
-        
+            return None, f"Invalid Instagram shortcode length: {len(shortcode)} characters"
+
+        if not _SHORTCODE_RE.match(shortcode):
+            return None, "Instagram shortcode contains invalid characters"
+
+        return PostURL(
+            platform="instagram",
+            post_type=post_type,
+            shortcode=shortcode,
+            canonical_url=f"https://www.instagram.com/{post_type}/{shortcode}/",
+        ), ""
+
+    if platform == "twitter":
+        if parsed.netloc.lower() not in _TWITTER_DOMAINS:
+            return None, f"URL must be from Twitter/X (got: {parsed.netloc})"
+
         # Twitter post validation can be added here
         path = parsed.path.strip("/")
         if not path:
-            return False, "Twitter URL must contain a post path"
+            return None, "Twitter URL must contain a post path"
+
+        # tweets look like /<user>/status/<id>
+        path_parts = path.split("/")
+        is_status = len(path_parts) >= 3 and path_parts[1] == "status"
+        return PostURL(
+            platform="twitter",
+            post_type="status" if is_status else None,
+            shortcode=path_parts[2] if is_status else None,
+            canonical_url=f"https://x.com/{path}",
+        ), ""
+
+    return None, f"Unsupported platform: {platform}"
+
+
+def classify_post_urls(urls: Iterable[str], platform: str = "instagram") -> tuple[dict, list]:
+    """
+    Classify many URLs, merging the ones that point at the same post.
+
+    URLs that differ only by query string or fragment (e.g. `?igsh=...`,
+    `?img_index=2`), scheme or `www.` share a canonical URL, so bulk jobs
+    scrape each post once.
+
+    Returns:
+        tuple: (unique, invalid) where unique maps canonical URL to
+        (PostURL, [input indices]) in first-seen order, and invalid is a
+        list of (index, url, error_message)
+    """
+    unique = {}
+    invalid = []
+    for i, url in enumerate(urls):
+        post_url, error = classify_post_url(url, platform)
+        if post_url is None:
+            invalid.append((i, url, error))
+        elif post_url.canonical_url in unique:
+            unique[post_url.canonical_url][1].append(i)
+        else:
+            unique[post_url.canonical_url] = (post_url, [i])
+    return unique, invalid
+
+
+def validate_post_url(url: str, platform: str = "instagram") -> tuple[bool, str]:
+    """
+    Validate a social media post URL.
     
-    else:
-        return False, f"Unsupported platform: {platform}"
+    Args:
+        url: The URL to validate
+        platform: The platform to validate against ("instagram", "twitter", etc.)
     
-    # All validations passed
-    return True, ""
-    
\ No newline at end of file
+    Returns:
+        tuple: (is_valid, error_message)
+    """
+    post_url, error = classify_post_url(url, platform)
+    return post_url is not None, error
@@ -1,11 +1,19 @@
 import os
+import copy
+import time
 import torch
 import asyncio
 import logging
+from collections import deque
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from utils.backends import check_backend_requirements, load_model, load_int8_model, load_saved_int8_model
+from utils.cache import SentimentCache
+from utils.metrics import InferenceTelemetry
 from utils.config import Config
-from utils.device import autodetect_device
-from typing import Optional, List
-from dataclasses import dataclass
+from utils.device import CpuPlan, autodetect_device, plan_cpu_workers, apply_cpu_threads, resolve_precision
+from typing import Optional, List, Deque, Tuple, Union
+from dataclasses import dataclass, field
 from pydantic import BaseModel
 from transformers import logging as hf_logging
 from transformers import AutoTokenizer, AutoModelForSequenceClassification
@@ -22,70 +30,1069 @@ class Worker:
     device: torch.device
     tokenizer: object
     model: object
-    
-    
+    executor: Optional[ThreadPoolExecutor] = field(default=None, repr=False)
+    compiled: bool = False
+    # "fp32" or "bf16", the dtype the model weights run in
+    precision: str = "fp32"
+    # pool generation this worker was built for, bumped by every model swap
+    generation: int = 0
+
+    def __post_init__(self):
+        # one dedicated thread per worker keeps tokenization and forward passes off the event loop
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"worker-{self.gpu_id}")
+
+    async def run(self, method: str, *args):
+        """Run one of this worker's methods on its executor and await the result."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, getattr(self, method), *args)
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+
+    @property
+    def max_length(self) -> int:
+        """
+        Longest input in tokens, the window long texts are split into.
+
+        A tokenizer saved without `model_max_length` reports a huge sentinel
+        (the cardiffnlp checkpoints ship no tokenizer config), so the model's
+        position embeddings bound it too. Two positions are left for RoBERTa,
+        whose position ids start after the padding index.
+        """
+        positions = getattr(self.model.config, "max_position_embeddings", None)
+        if positions is None:
+            return self.tokenizer.model_max_length
+        return min(self.tokenizer.model_max_length, positions - 2)
+
+    def ping(self) -> int:
+        """Return the pid of the process running this worker's model."""
+        return os.getpid()
+
+    def compile(self) -> bool:
+        """Compile the model with torch.compile, keeping the eager model around in case compilation fails."""
+        if not isinstance(self.model, torch.nn.Module):
+            logger.warning(f"Worker {self.gpu_id}: {type(self.model).__name__} can't be compiled, staying eager")
+            return False
+
+        self._eager_model = self.model
+        # dynamic shapes so every batch size / sequence length doesn't trigger a recompile
+        self.model = torch.compile(self.model, dynamic=True)
+        self.compiled = True
+        return True
+
+    def warmup(self, seq_lengths: Tuple[int, ...], batch_sizes: Tuple[int, ...]):
+        """Run synthetic batches at every sequence length and batch size so kernels, allocator pools and tokenizer caches are hot."""
+        for length in seq_lengths:
+            length = min(length, self.max_length)
+            for batch_size in batch_sizes:
+                inputs = self.tokenizer(
+                    ["warmup " * length] * batch_size,
+                    return_tensors="pt",
+                    padding="max_length",
+                    truncation=True,
+                    max_length=length,
+                )
+                try:
+                    self._forward(inputs, _new_timings())
+                except Exception:
+                    # torch.compile fails lazily on the first call, fall back to eager
+                    if not self.compiled:
+                        raise
+                    logger.exception(f"Worker {self.gpu_id}: compiled model failed during warmup, falling back to eager")
+                    self.model = self._eager_model
+                    self.compiled = False
+                    self._forward(inputs, _new_timings())
+
+    def classify(self, texts: List[str]) -> Tuple[List[dict], dict]:
+        """Run one padded forward pass over `texts` and return a result per text, plus stage timings."""
+        timings = _new_timings()
+        start = time.perf_counter()
+        inputs = self.tokenizer(texts, return_tensors="pt", padding=True, truncation=True, max_length=self.max_length)
+        timings["tokenize_ms"] += (time.perf_counter() - start) * 1000
+
+        return self._forward(inputs, timings), timings
+
+    def classify_bucketed(self, texts: List[str], bucket_size: int) -> Tuple[List[dict], dict]:
+        """
+        Classify many texts, padding each bucket only to its own longest text.
+
+        Texts are tokenized once, sorted by token length and split into buckets
+        of `bucket_size`, so short captions are never padded up to long ones.
+        Results are returned in input order.
+        """
+        timings = _new_timings()
+        start = time.perf_counter()
+        encodings = self.tokenizer(texts, truncation=True, max_length=self.max_length)
+        input_ids = encodings["input_ids"]
+        order = sorted(range(len(texts)), key=lambda i: len(input_ids[i]))
+        timings["tokenize_ms"] += (time.perf_counter() - start) * 1000
+
+        results: List[Optional[dict]] = [None] * len(texts)
+        for start in range(0, len(order), bucket_size):
+            bucket = order[start:start + bucket_size]
+
+            pad_start = time.perf_counter()
+            features = [{key: encodings[key][i] for key in encodings.keys()} for i in bucket]
+            inputs = self.tokenizer.pad(features, return_tensors="pt")
+            timings["tokenize_ms"] += (time.perf_counter() - pad_start) * 1000
+
+            for i, result in zip(bucket, self._forward(inputs, timings)):
+                results[i] = result
+
+        return results, timings
+
+    def classify_long(self, text: str, stride: int, max_chunks: int) -> Tuple[dict, dict]:
+        """
+        Classify a text longer than the model's window instead of truncating it.
+
+        The text is split into overlapping token windows (`stride` tokens shared
+        between neighbours), at most `max_chunks` of them are scored in one
+        batched forward pass, and the window probabilities are combined with a
+        confidence-weighted mean.
+        """
+        timings = _new_timings()
+        start = time.perf_counter()
+        inputs = self.tokenizer(
+            text,
+            return_tensors="pt",
+            padding=True,
+            truncation=True,
+            max_length=self.max_length,
+            stride=stride,
+            return_overflowing_tokens=True,
+        )
+        total_chunks = inputs["input_ids"].shape[0]
+        num_chunks = min(total_chunks, max_chunks)
+        inputs = {
+            "input_ids": inputs["input_ids"][:num_chunks],
+            "attention_mask": inputs["attention_mask"][:num_chunks],
+        }
+        timings["tokenize_ms"] += (time.perf_counter() - start) * 1000
+
+        probs = self._probs(inputs, timings)
+
+        start = time.perf_counter()
+        weights = probs.max(dim=-1).values
+        combined = (probs * weights.unsqueeze(-1)).sum(dim=0) / weights.sum()
+
+        result = self._build_result(combined.tolist())
+        result["num_chunks"] = num_chunks
+        result["truncated"] = total_chunks > num_chunks
+        timings["postprocess_ms"] += (time.perf_counter() - start) * 1000
+
+        return result, timings
+
+    def _forward(self, inputs, timings: dict) -> List[dict]:
+        probs = self._probs(inputs, timings)
+
+        start = time.perf_counter()
+        results = [self._build_result(p) for p in probs.tolist()]
+        timings["postprocess_ms"] += (time.perf_counter() - start) * 1000
+        return results
+
+    def _probs(self, inputs, timings: dict) -> torch.Tensor:
+        start = time.perf_counter()
+        inputs = {key: value.to(self.device) for key, value in inputs.items()}
+
+        with torch.no_grad():
+            outputs = self.model(**inputs)
+            probs = torch.softmax(outputs.logits.float(), dim=-1).cpu()
+
+        timings["forward_ms"] += (time.perf_counter() - start) * 1000
+        timings["forwards"].append(tuple(inputs["input_ids"].shape))
+        return probs
+
+    def _build_result(self, probs: List[float]) -> dict:
+        id2label = self.model.config.id2label
+        max_idx = max(range(len(probs)), key=probs.__getitem__)
+
+        return {
+            "predicted_label": id2label[max_idx],
+            "confidence": round(probs[max_idx], 4),
+            "all_scores": {id2label[i]: round(p, 4) for i, p in enumerate(probs)},
+        }
+
+
+def _new_timings() -> dict:
+    # "forwards" holds the (batch_size, seq_length) of every forward pass
+    return {"tokenize_ms": 0.0, "forward_ms": 0.0, "postprocess_ms": 0.0, "forwards": []}
+
+
+class PoolOverloaded(Exception):
+    """Raised when a request is shed because the worker queue is full or its deadline passed."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+# The Worker owned by this process when running as a ProcessWorker child
+_process_worker: Optional[Worker] = None
+
+
+def _init_process_worker(gpu_id: int, tokenizer, model, precision: str, num_threads: int, interop_threads: int, cores: Optional[List[int]]):
+    global _process_worker
+    if cores and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cores)
+    apply_cpu_threads(num_threads, interop_threads)
+    if isinstance(model, str):
+        model = load_saved_int8_model(model)
+    _process_worker = Worker(
+        gpu_id=gpu_id,
+        device=torch.device("cpu"),
+        model=model,
+        tokenizer=tokenizer,
+        precision=precision,
+    )
+
+
+def _call_process_worker(method: str, *args):
+    return getattr(_process_worker, method)(*args)
+
+
+class ProcessWorker:
+    """
+    A CPU worker that runs its model in a dedicated child process.
+
+    It has the same `run`/`close` interface as `Worker`, so the pool and the
+    scheduler treat both the same way. The model passed in should already
+    live in shared memory (`model.share_memory()`); the spawned process then
+    maps the parent's weights read-only instead of holding its own copy.
+    A dynamic-quantized model can't be shared that way, so for int8 `model`
+    is the path of the cached int8 file and the child loads it itself.
+    """
+
+    def __init__(
+        self,
+        gpu_id: int,
+        tokenizer,
+        model,
+        num_threads: int,
+        interop_threads: int = 1,
+        cores: Optional[List[int]] = None,
+        precision: str = "fp32",
+    ):
+        self.gpu_id = gpu_id
+        self.device = torch.device("cpu")
+        self.precision = precision
+        self.num_threads = num_threads
+        self.cores = cores
+        self.generation = 0
+        self.pid: Optional[int] = None
+        self.executor = ProcessPoolExecutor(
+            max_workers=1,
+            mp_context=torch.multiprocessing.get_context("spawn"),
+            initializer=_init_process_worker,
+            initargs=(gpu_id, tokenizer, model, precision, num_threads, interop_threads, cores),
+        )
+
+    async def start(self):
+        """Spawn the child process and wait until its model is ready."""
+        self.pid = await self.run("ping")
+
+    async def run(self, method: str, *args):
+        """Run one of the child's `Worker` methods and await the result."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, _call_process_worker, method, *args)
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+AnyWorker = Union[Worker, ProcessWorker]
+
+
+@dataclass
+class _PendingRequest:
+    """A single text waiting to be placed into a batch."""
+    text: str
+    future: asyncio.Future
+    # set once the request has been placed into a batch
+    started: bool = False
+    enqueued_at: float = field(default_factory=time.perf_counter)
+
+
+class BatchScheduler:
+    """
+    Collects concurrent classification requests into padded batches.
+
+    Requests are held for at most `max_wait_ms` (or until `max_batch_size`
+    requests are queued), then run together on the next free worker. Each
+    caller gets back only its own result.
+    """
+
+    def __init__(self, pool: "WorkerPool", max_batch_size: int = 16, max_wait_ms: float = 5.0):
+        self.pool = pool
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+
+        self._pending: Deque[_PendingRequest] = deque()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._inflight: set = set()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Batch scheduler started (max_batch_size={self.max_batch_size}, max_wait_ms={self.max_wait_ms})")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+
+        while self._pending:
+            request = self._pending.popleft()
+            if not request.future.done():
+                request.future.set_exception(RuntimeError("Batch scheduler stopped"))
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    async def submit(self, text: str) -> dict:
+        self.pool.admit()
+
+        request = _PendingRequest(text=text, future=asyncio.get_running_loop().create_future())
+        self._pending.append(request)
+        self._wakeup.set()
+
+        try:
+            # only requests that were not placed into a batch before their deadline are shed
+            done, _ = await asyncio.wait({request.future}, timeout=self.pool.request_deadline_s)
+            if not done and not request.started:
+                self._discard(request)
+                self.pool.expired += 1
+                raise PoolOverloaded("Request could not be scheduled before its deadline", self.pool.retry_after_s)
+
+            return await request.future
+        except asyncio.CancelledError:
+            # the caller went away (e.g. client disconnect), don't spend a batch slot on it
+            if not request.started:
+                self._discard(request)
+                self.pool.cancelled += 1
+            raise
+
+    def _discard(self, request: _PendingRequest):
+        request.future.cancel()
+        try:
+            self._pending.remove(request)
+        except ValueError:
+            pass
+
+    async def _wait_for_batch(self):
+        """Wait until a full batch is queued or the batching window closes."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait_ms / 1000
+
+        while len(self._pending) < self.max_batch_size:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=remaining)
+            except asyncio.TimeoutError:
+                break
+
+    def _take_batch(self) -> List[_PendingRequest]:
+        batch = []
+        while self._pending and len(batch) < self.max_batch_size:
+            request = self._pending.popleft()
+            # skip callers that already went away or were shed
+            if not request.future.done():
+                request.started = True
+                batch.append(request)
+
+        now = time.perf_counter()
+        for request in batch:
+            self.pool.telemetry.record_queue_wait((now - request.enqueued_at) * 1000)
+        return batch
+
+    async def _run(self):
+        while True:
+            while not self._pending:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+
+            await self._wait_for_batch()
+
+            # requests keep accumulating while we wait for a worker
+            worker = await self.pool.acquire_worker()
+            batch = self._take_batch()
+            if not batch:
+                await self.pool.release_worker(worker)
+                continue
+
+            task = asyncio.create_task(self._run_batch(worker, batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _run_batch(self, worker: AnyWorker, batch: List[_PendingRequest]):
+        start = time.perf_counter()
+        try:
+            results = await self.pool.run_timed(worker, "classify", [request.text for request in batch])
+        except Exception as e:
+            logger.exception(f"Batch of {len(batch)} failed on worker {worker.gpu_id}")
+            for request in batch:
+                if not request.future.done():
+                    request.future.set_exception(e)
+        else:
+            for request, result in zip(batch, results):
+                if not request.future.done():
+                    request.future.set_result(result)
+
+            if self.pool.autotuner is not None:
+                now = time.perf_counter()
+                oldest = min(request.enqueued_at for request in batch)
+                self.pool.autotuner.observe(len(batch), (now - oldest) * 1000, (now - start) * 1000)
+        finally:
+            await self.pool.release_worker(worker)
+
+
+class BatchAutotuner:
+    """
+    Retunes a `BatchScheduler`'s batch size and batching window from live traffic.
+
+    Every `interval_s` it looks at the batches completed since the last check:
+    their latency (from the oldest request's enqueue to its result), their
+    service time on the worker, how full they were, and the queue depth.
+
+    - service p95 over the target: the batches themselves are too slow, shrink
+      the batch size and halve the wait window
+    - latency p95 over the target: halve the wait window, and if batches are
+      full or requests are backing up grow the batch size to drain the queue
+    - latency p95 well under the target and batches are full or requests are
+      backing up: grow the batch size
+    - latency p95 well under the target and concurrent requests only
+      half-fill batches: widen the wait window so more of them share a
+      forward pass
+
+    Values always stay within the configured bounds.
+    """
+
+    # below this fraction of the target there is room to trade latency for throughput
+    HEADROOM = 0.8
+    MIN_SAMPLES = 5
+
+    def __init__(
+        self,
+        scheduler: BatchScheduler,
+        p95_target_ms: float,
+        min_batch_size: int,
+        max_batch_size: int,
+        min_wait_ms: float,
+        max_wait_ms: float,
+        interval_s: float = 5.0,
+    ):
+        self.scheduler = scheduler
+        self.p95_target_ms = p95_target_ms
+        self.min_batch_size = min_batch_size
+        self.max_batch_size = max_batch_size
+        self.min_wait_ms = min_wait_ms
+        self.max_wait_ms = max_wait_ms
+        self.interval_s = interval_s
+
+        scheduler.max_batch_size = min(max(scheduler.max_batch_size, min_batch_size), max_batch_size)
+        scheduler.max_wait_ms = min(max(scheduler.max_wait_ms, min_wait_ms), max_wait_ms)
+
+        # Structure: [(batch_size, latency_ms, service_ms), ...] since the last adjustment
+        self._samples: List[Tuple[int, float, float]] = []
+        self.last_p95_ms = 0.0
+        self.last_service_p95_ms = 0.0
+        self.decisions: Deque[dict] = deque(maxlen=50)
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info(
+                f"Batch autotuner started (p95 target {self.p95_target_ms}ms, "
+                f"batch size {self.min_batch_size}-{self.max_batch_size}, "
+                f"wait {self.min_wait_ms}-{self.max_wait_ms}ms)"
+            )
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def observe(self, batch_size: int, latency_ms: float, service_ms: float):
+        self._samples.append((batch_size, latency_ms, service_ms))
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval_s)
+            self.adjust()
+
+    def adjust(self) -> Optional[dict]:
+        """Apply one tuning step from the samples collected since the last one."""
+        samples, self._samples = self._samples, []
+        if len(samples) < self.MIN_SAMPLES:
+            return None
+
+        p95_ms = self._p95([latency for _, latency, _ in samples])
+        service_p95_ms = self._p95([service for _, _, service in samples])
+        avg_batch_size = sum(size for size, _, _ in samples) / len(samples)
+        queue_depth = self.scheduler.pool.queue_depth()
+        self.last_p95_ms = p95_ms
+        self.last_service_p95_ms = service_p95_ms
+
+        batch_size = self.scheduler.max_batch_size
+        wait_ms = self.scheduler.max_wait_ms
+        saturated = avg_batch_size / batch_size >= 0.9 or queue_depth >= batch_size
+        grown = min(self.max_batch_size, batch_size + max(1, batch_size // 4))
+
+        if service_p95_ms > self.p95_target_ms:
+            batch_size = max(self.min_batch_size, int(batch_size * 0.75))
+            wait_ms = wait_ms / 2
+            reason = "batch service time over target"
+        elif p95_ms > self.p95_target_ms:
+            if saturated:
+                batch_size = grown
+            wait_ms = wait_ms / 2
+            reason = "latency over target" + (" with a backlog" if saturated else "")
+        elif p95_ms < self.p95_target_ms * self.HEADROOM and saturated:
+            batch_size = grown
+            reason = "batches full or queue backing up"
+        elif p95_ms < self.p95_target_ms * self.HEADROOM and avg_batch_size / batch_size < 0.5 and avg_batch_size > 1:
+            wait_ms = max(wait_ms * 2, 1.0)
+            reason = "batches under-filled"
+        else:
+            return None
+
+        wait_ms = round(min(max(wait_ms, self.min_wait_ms), self.max_wait_ms), 2)
+        if batch_size == self.scheduler.max_batch_size and wait_ms == round(self.scheduler.max_wait_ms, 2):
+            return None
+
+        decision = {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "reason": reason,
+            "p95_ms": round(p95_ms, 2),
+            "service_p95_ms": round(service_p95_ms, 2),
+            "avg_batch_size": round(avg_batch_size, 2),
+            "queue_depth": queue_depth,
+            "max_batch_size": [self.scheduler.max_batch_size, batch_size],
+            "max_wait_ms": [round(self.scheduler.max_wait_ms, 2), wait_ms],
+        }
+        self.scheduler.max_batch_size = batch_size
+        self.scheduler.max_wait_ms = wait_ms
+        self.decisions.append(decision)
+
+        logger.info(
+            f"Batch autotuner: {reason} (p95 {p95_ms:.2f}ms, service p95 {service_p95_ms:.2f}ms, avg batch {avg_batch_size:.2f}, "
+            f"queue {queue_depth}), max_batch_size {decision['max_batch_size'][0]} -> {batch_size}, "
+            f"max_wait_ms {decision['max_wait_ms'][0]} -> {decision['max_wait_ms'][1]}"
+        )
+        return decision
+
+    @staticmethod
+    def _p95(values: List[float]) -> float:
+        values = sorted(values)
+        return values[int(len(values) * 0.95)]
+
+    def stats(self) -> dict:
+        return {
+            "p95_target_ms": self.p95_target_ms,
+            "last_p95_ms": round(self.last_p95_ms, 2),
+            "last_service_p95_ms": round(self.last_service_p95_ms, 2),
+            "batch_size_bounds": [self.min_batch_size, self.max_batch_size],
+            "wait_ms_bounds": [self.min_wait_ms, self.max_wait_ms],
+            "decisions": list(self.decisions),
+        }
+
+
 class WorkerPool:
-    
+
     def __init__(self, num_gpus: Optional[int] = None):
-        
+
         self.device_type = autodetect_device()
         if num_gpus is None:
             if self.device_type == 'cuda':
                 self.num_gpus = torch.cuda.device_count()
             else:
                 self.num_gpus = 1
-                
-        self.workers: List[Worker] = []
+        else:
+            self.num_gpus = num_gpus
+
+        # "thread" runs each model in-process, "process" runs one child process per CPU worker
+        self.mode = "thread"
+        # CPU only: worker count, thread counts and core pinning planned from the topology
+        self.cpu_plan: Optional[CpuPlan] = None
+        self.precision = "fp32"
+        self.backend = Config.backend
+        # accuracy report for the int8 model, when one was requested
+        self.quantization: Optional[dict] = None
+        # seconds spent in each startup stage (download, disk_read, device_transfer, warmup)
+        self.startup_timings: dict = {}
+        # only True once every worker has been warmed up
+        self.ready = False
+        self._warmup_task: Optional[asyncio.Task] = None
+        self.workers: List[AnyWorker] = []
         self.available_workers: asyncio.Queue = asyncio.Queue()
-        
+        # model swaps: workers of older generations are retired once released
+        self.config: Optional[Config] = None
+        self.generation = 0
+        self.draining: List[AnyWorker] = []
+        self.swaps: List[dict] = []
+        self._swap_lock = asyncio.Lock()
+        self.scheduler: Optional[BatchScheduler] = None
+        self.autotuner: Optional[BatchAutotuner] = None
+
+        # admission control: bounded queue and a per-request deadline to start
+        self.max_queue_depth = Config.max_queue_depth
+        self.request_deadline_s = Config.request_deadline_ms / 1000
+        self.retry_after_s = Config.retry_after_s
+        self.rejected = 0
+        self.expired = 0
+        # queued requests dropped because their caller went away
+        self.cancelled = 0
+        self._direct_waiters = 0
+        self.bucket_size = Config.bucket_size
+        self.long_text_stride = Config.long_text_stride
+        self.long_text_max_chunks = Config.long_text_max_chunks
+        self.cache: Optional[SentimentCache] = None
+        self.telemetry = InferenceTelemetry()
+
 
     async def initialize(self, config: Config):
+        self.config = config
+        model_name = config.model_name
+        self.cpu_plan = self._plan_cpu(config)
+        # apply thread counts before loading: torch's interop threads can only be set before parallel work starts
+        self._apply_cpu_plan(self.cpu_plan)
+        workers, timings, self.quantization, self.precision = await self._build_workers(config, self.cpu_plan)
+        self.backend = config.backend
+        self.mode = "process" if isinstance(workers[0], ProcessWorker) else "thread"
+
+        for worker in workers:
+            self.workers.append(worker)
+            await self.available_workers.put(worker)
+
+        self.startup_timings = {stage: round(seconds, 3) for stage, seconds in timings.items()}
+        logger.info(f"All {len(self.workers)} workers loaded in {sum(timings.values()):.2f}s, warming up...")
+
+        # the server starts answering (with ready=False) while workers warm up in the background
+        self._warmup_task = asyncio.create_task(self._startup_warmup(config, workers, timings))
+
+        self.max_queue_depth = config.max_queue_depth
+        self.request_deadline_s = config.request_deadline_ms / 1000
+        self.retry_after_s = config.retry_after_s
+
+        self.bucket_size = config.bucket_size
+        self.long_text_stride = config.long_text_stride
+        self.long_text_max_chunks = config.long_text_max_chunks
+        self.cache = SentimentCache(
+            model_name,
+            max_entries=config.cache_max_entries,
+            ttl_seconds=config.cache_ttl_seconds,
+        )
+
+        self.scheduler = BatchScheduler(
+            self,
+            max_batch_size=config.max_batch_size,
+            max_wait_ms=config.max_batch_wait_ms,
+        )
+        self.scheduler.start()
+
+        if config.autotune_batching:
+            self.autotuner = BatchAutotuner(
+                self.scheduler,
+                p95_target_ms=config.autotune_p95_target_ms,
+                min_batch_size=config.autotune_min_batch_size,
+                max_batch_size=config.autotune_max_batch_size,
+                min_wait_ms=config.autotune_min_wait_ms,
+                max_wait_ms=config.autotune_max_wait_ms,
+                interval_s=config.autotune_interval_s,
+            )
+            self.autotuner.start()
+
+    def _plan_cpu(self, config: Config) -> Optional[CpuPlan]:
+        """Plan CPU workers for `config`, None on GPU."""
+        if self.device_type != "cpu":
+            return None
+
+        plan = plan_cpu_workers(
+            workers=config.cpu_workers,
+            threads_per_worker=config.cpu_threads_per_worker,
+            interop_threads=config.cpu_interop_threads,
+            pin=config.cpu_pin_workers,
+        )
+        logger.info(f"CPU plan: {plan}")
+        return plan
+
+    @staticmethod
+    def _apply_cpu_plan(plan: Optional[CpuPlan]):
+        if plan is not None and plan.workers == 1:
+            # the single worker runs in this process
+            apply_cpu_threads(plan.intra_op_threads, plan.interop_threads)
+
+    async def _build_workers(self, config: Config, cpu_plan: Optional[CpuPlan]) -> Tuple[List[AnyWorker], dict, Optional[dict], str]:
+        """
+        Download (if needed) and load the model described by `config` and build a worker per device.
+
+        Leaves the pool's own state alone, so it can build shadow workers while
+        the current ones keep serving.
+
+        Returns:
+            tuple: (workers, seconds per startup stage, int8 accuracy report or None, precision)
+        """
+        # fail before downloading anything if the backend's optional packages are missing
+        check_backend_requirements(config.backend)
+
+        timings = {}
         model_name = config.model_name
         local_model_path = os.path.join(config.model_dir, model_name.replace('/', '_'))
+
+        start = time.perf_counter()
         if os.path.exists(local_model_path):
             logger.info("Model exists locally, skipping download")
         else:
-            tokenizer = AutoTokenizer.from_pretrained(config.model_name)
-            model = AutoModelForSequenceClassification.from_pretrained(config.model_name)
+            await asyncio.to_thread(self._download_model, model_name, local_model_path)
+        timings["download"] = time.perf_counter() - start
+
+        logger.info(f"Using {config.backend} inference backend")
+
+        # read the tokenizer and weights from disk once (safetensors are memory-mapped),
+        # every worker is then built from this copy
+        start = time.perf_counter()
+        tokenizer = await asyncio.to_thread(AutoTokenizer.from_pretrained, local_model_path)
+        model, quantization = await asyncio.to_thread(self._load_model, config, local_model_path)
+        model.eval()
+        timings["disk_read"] = time.perf_counter() - start
+
+        precision = self._resolve_precision(config, model, quantization)
+        if precision == "bf16":
+            model = model.to(torch.bfloat16)
+        logger.info(f"Running the model in {precision}")
+
+        start = time.perf_counter()
+        if cpu_plan is not None and cpu_plan.workers > 1:
+            int8_path = quantization["path"] if quantization and quantization["accepted"] else None
+            workers = await self._start_cpu_processes(cpu_plan, tokenizer, model, precision, int8_path)
+        else:
+            workers = await self._place_on_devices(tokenizer, model, precision)
+        timings["device_transfer"] = time.perf_counter() - start
+
+        return workers, timings, quantization, precision
+
+    async def _warmup(self, config: Config, workers: List[AnyWorker]):
+        """Optionally compile, then run the warmup batches on every worker in parallel."""
+        if config.compile_model:
+            await asyncio.gather(*(worker.run("compile") for worker in workers))
+        await asyncio.gather(*(
+            worker.run("warmup", config.warmup_seq_lengths, config.warmup_batch_sizes)
+            for worker in workers
+        ))
+
+    async def _startup_warmup(self, config: Config, workers: List[AnyWorker], timings: dict):
+        start = time.perf_counter()
+        try:
+            await self._warmup(config, workers)
+        except Exception:
+            logger.exception("Worker warmup failed, pool will not report ready")
+            return
+        timings["warmup"] = time.perf_counter() - start
+
+        self.startup_timings = {stage: round(seconds, 3) for stage, seconds in timings.items()}
+        breakdown = ", ".join(f"{stage} {seconds:.2f}s" for stage, seconds in timings.items())
+        logger.info(f"All {len(workers)} workers ready in {sum(timings.values()):.2f}s ({breakdown})")
+        self.ready = True
 
-            model.save_pretrained(local_model_path)
-            tokenizer.save_pretrained(local_model_path)
+    def _download_model(self, model_name: str, local_model_path: str):
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        model = AutoModelForSequenceClassification.from_pretrained(model_name)
 
-            logger.info(f"Saved pretrained model to {local_model_path}")
+        model.save_pretrained(local_model_path)
+        tokenizer.save_pretrained(local_model_path)
 
+        logger.info(f"Saved pretrained model to {local_model_path}")
+
+    def _load_model(self, config: Config, local_model_path: str) -> Tuple[object, Optional[dict]]:
+        """Load the model for `config`, returning it with the int8 accuracy report (None when not quantizing)."""
+        if not config.quantize_int8:
+            return load_model(config.backend, local_model_path), None
+
+        if config.backend != "torch" or self.device_type != "cpu":
+            logger.warning(f"int8 quantization needs the torch backend on cpu, loading {config.backend} on {self.device_type} unquantized")
+            return load_model(config.backend, local_model_path), None
+
+        return load_int8_model(
+            local_model_path,
+            min_agreement=config.int8_min_label_agreement,
+            max_confidence_delta=config.int8_max_confidence_delta,
+        )
+
+    def _resolve_precision(self, config: Config, model, quantization: Optional[dict]) -> str:
+        if config.precision == "fp32":
+            return "fp32"
+        if not isinstance(model, torch.nn.Module) or (quantization and quantization["accepted"]):
+            logger.warning(f"{config.precision} needs the unquantized torch backend, running {config.backend} in fp32")
+            return "fp32"
+        return resolve_precision(self.device_type, config.precision)
+
+    async def _place_on_devices(self, tokenizer, model, precision: str = "fp32") -> List[Worker]:
+        """Copy the loaded model to every device in parallel and build a worker per device."""
         logger.info(f"Initializing worker pool with {self.num_gpus} worker(s)...")
         if self.num_gpus > 1:
             assert self.device_type == "cuda", "Only CUDA supports multiple workers/GPUs. cpu|mps does not."
 
-        
-        for gpu_id in range(self.num_gpus):
-            if self.device_type == "cuda":
-                device = torch.device(f"cuda:{gpu_id}")
-                logger.info(f"Loading model on GPU {gpu_id}")
-            else:
-                device = torch.device(self.device_type)
-                logger.info(f"Loading model on {self.device_type}")
+        if self.device_type == "cuda":
+            devices = [torch.device(f"cuda:{gpu_id}") for gpu_id in range(self.num_gpus)]
+        else:
+            devices = [torch.device(self.device_type)]
 
-            
-            tokenizer = AutoTokenizer.from_pretrained(local_model_path)
-            model = AutoModelForSequenceClassification.from_pretrained(local_model_path)
-            model.to(device)
-            model.eval()
+        def place(gpu_id: int, device: torch.device) -> Worker:
+            logger.info(f"Loading model on {device}")
+            # a single device takes the loaded objects as they are. With several, each
+            # worker gets its own copy: fast tokenizers are not safe to share across
+            # worker threads, and copying is far cheaper than re-reading from disk
+            shared = len(devices) == 1
+            worker_model = model if shared else copy.deepcopy(model)
+            worker_model.to(device)
 
-            worker = Worker(
+            return Worker(
                 gpu_id=gpu_id,
                 device=device,
-                model=model,
-                tokenizer=tokenizer,
+                model=worker_model,
+                tokenizer=tokenizer if shared else copy.deepcopy(tokenizer),
+                precision=precision,
             )
 
-            self.workers.append(worker)
-            await self.available_workers.put(worker)
+        return list(await asyncio.gather(*(asyncio.to_thread(place, gpu_id, device) for gpu_id, device in enumerate(devices))))
+
+    async def _start_cpu_processes(self, plan: CpuPlan, tokenizer, model, precision: str = "fp32", int8_path: Optional[str] = None) -> List[ProcessWorker]:
+        """Start `plan.workers` child processes sharing one copy of the model weights."""
+        logger.info(f"Initializing CPU worker pool with {plan.workers} process(es), {plan.intra_op_threads} thread(s) each...")
+
+        if int8_path is not None:
+            # spawn can't pickle shared-memory quantized tensors, every child loads its own int8 copy
+            model = int8_path
+        else:
+            # move the weights into shared memory once, children map them instead of copying
+            model.share_memory()
+
+        workers = [
+            ProcessWorker(
+                worker_id,
+                tokenizer,
+                model,
+                plan.intra_op_threads,
+                interop_threads=plan.interop_threads,
+                cores=plan.pinning[worker_id] if plan.pinning else None,
+                precision=precision,
+            )
+            for worker_id in range(plan.workers)
+        ]
+        await asyncio.gather(*(worker.start() for worker in workers))
+
+        for worker in workers:
+            logger.info(f"CPU worker {worker.gpu_id} running in process {worker.pid}" + (f" on cores {worker.cores}" if worker.cores else ""))
+        return workers
+
+    async def shutdown(self):
+        if self._warmup_task is not None and not self._warmup_task.done():
+            self._warmup_task.cancel()
+
+        if self.autotuner is not None:
+            await self.autotuner.stop()
+
+        if self.scheduler is not None:
+            await self.scheduler.stop()
+
+        for worker in self.workers + self.draining:
+            worker.close()
+
+    async def swap_model(self, config: Config) -> dict:
+        """
+        Replace every worker with workers serving the model described by `config`, without downtime.
+
+        The new (shadow) workers are loaded and warmed up while the current
+        ones keep serving, so capacity never drops; device memory must fit
+        both models for the duration of the swap. The switch itself happens
+        without yielding to the event loop: idle old workers are retired at
+        once and busy ones as soon as their in-flight batch is released.
+        """
+        if self.swap_in_progress:
+            raise RuntimeError("A model swap is already in progress")
+
+        async with self._swap_lock:
+            start = time.perf_counter()
+            logger.info(f"Swapping model to {config.model_name} ({config.backend}), loading shadow workers...")
+            cpu_plan = self._plan_cpu(config)
+            workers, timings, quantization, precision = await self._build_workers(config, cpu_plan)
+
+            warmup_start = time.perf_counter()
+            try:
+                await self._warmup(config, workers)
+            except Exception:
+                for worker in workers:
+                    worker.close()
+                raise
+            timings["warmup"] = time.perf_counter() - warmup_start
 
-        logger.info(f"All {self.num_gpus} workers initialized")
+            # --- atomic switch, no awaits from here on ---
+            self.generation += 1
+            for worker in workers:
+                worker.generation = self.generation
 
-    async def acquire_worker(self) -> Worker:
+            retired, self.workers = self.workers, list(workers)
+            idle = []
+            while not self.available_workers.empty():
+                idle.append(self.available_workers.get_nowait())
+            for worker in workers:
+                self.available_workers.put_nowait(worker)
+
+            self.draining.extend(retired)
+            for worker in idle:
+                self._retire(worker)
+
+            previous = self.config.model_name if self.config else None
+            self.config = config
+            self.backend = config.backend
+            self.quantization = quantization
+            self.cpu_plan = cpu_plan
+            self.precision = precision
+            self._apply_cpu_plan(cpu_plan)
+            self.mode = "process" if isinstance(workers[0], ProcessWorker) else "thread"
+            # results of the old model must not be served for the new one
+            self.cache.model_name = config.model_name
+            self.cache.clear()
+
+            swap = {
+                "timestamp": datetime.now().isoformat(timespec="seconds"),
+                "generation": self.generation,
+                "from": previous,
+                "to": config.model_name,
+                "backend": config.backend,
+                "quantization": quantization,
+                "timings": {stage: round(seconds, 3) for stage, seconds in timings.items()},
+                "total_s": round(time.perf_counter() - start, 3),
+                "draining": len(self.draining),
+            }
+            self.swaps.append(swap)
+            logger.info(f"Swapped to {config.model_name} (generation {self.generation}) in {swap['total_s']}s, draining {len(self.draining)} old worker(s)")
+            return swap
+
+    @property
+    def swap_in_progress(self) -> bool:
+        return self._swap_lock.locked()
+
+    def _retire(self, worker: AnyWorker):
+        """Close an old-generation worker once nothing is running on it."""
+        self.draining.remove(worker)
+        worker.close()
+        logger.info(f"Retired worker {worker.gpu_id} of generation {worker.generation}")
+
+        if not self.draining and self.device_type == "cuda":
+            torch.cuda.empty_cache()
+
+    async def classify(self, text: str) -> dict:
+        """Classify a single text through the result cache and batching scheduler."""
+        return await self.cache.get_or_compute(text, self.scheduler.submit)
+
+    async def classify_long(self, text: str) -> dict:
+        """Classify a long text with overlapping windows on one worker (cached separately from short results)."""
+        async def _classify(text: str) -> dict:
+            return await self._run_on_worker("classify_long", text, self.long_text_stride, self.long_text_max_chunks)
+
+        return await self.cache.get_or_compute(text, _classify, variant="long")
+
+    async def classify_batch(self, texts: List[str]) -> List[dict]:
+        """Classify a list of texts, running only cache misses on one worker with length-bucketed padding."""
+        results = self.cache.get_many(texts)
+        misses = [i for i, result in enumerate(results) if result is None]
+        if not misses:
+            return results
+
+        miss_texts = [texts[i] for i in misses]
+        classified = await self._run_on_worker("classify_bucketed", miss_texts, self.bucket_size)
+
+        self.cache.set_many(miss_texts, classified)
+        for i, result in zip(misses, classified):
+            results[i] = result
+        return results
+
+    async def _run_on_worker(self, method: str, *args):
+        """Run a worker method directly (bypassing the batching scheduler), subject to admission control."""
+        self.admit()
+
+        self._direct_waiters += 1
+        start = time.perf_counter()
+        try:
+            worker = await asyncio.wait_for(self.acquire_worker(), timeout=self.request_deadline_s)
+        except asyncio.TimeoutError:
+            self.expired += 1
+            raise PoolOverloaded("No worker became available before the request deadline", self.retry_after_s)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        finally:
+            self._direct_waiters -= 1
+        self.telemetry.record_queue_wait((time.perf_counter() - start) * 1000)
+
+        try:
+            return await self.run_timed(worker, method, *args)
+        finally:
+            await self.release_worker(worker)
+
+    async def run_timed(self, worker: AnyWorker, method: str, *args):
+        """Run an inference method on `worker`, record its stage timings and return only its results."""
+        start = time.perf_counter()
+        results, timings = await worker.run(method, *args)
+        busy_ms = (time.perf_counter() - start) * 1000
+
+        num_requests = len(results) if isinstance(results, list) else 1
+        self.telemetry.record_batch(worker.gpu_id, num_requests, busy_ms, timings)
+        return results
+
+    def queue_depth(self) -> int:
+        """Requests waiting for a worker, both in the batching scheduler and direct callers."""
+        scheduled = len(self.scheduler) if self.scheduler is not None else 0
+        return scheduled + self._direct_waiters
+
+    def admit(self):
+        """Reject the request right away if the queue is already at capacity."""
+        if self.queue_depth() >= self.max_queue_depth:
+            self.rejected += 1
+            raise PoolOverloaded("Worker queue is full", self.retry_after_s)
+
+    def queue_stats(self) -> dict:
+        return {
+            "depth": self.queue_depth(),
+            "max_depth": self.max_queue_depth,
+            "deadline_ms": round(self.request_deadline_s * 1000),
+            "rejected": self.rejected,
+            "expired": self.expired,
+            "cancelled": self.cancelled,
+        }
+
+    def batching_stats(self) -> dict:
+        """Current batching parameters and, when enabled, the autotuner's recent decisions."""
+        if self.scheduler is None:
+            return {}
+        return {
+            "max_batch_size": self.scheduler.max_batch_size,
+            "max_wait_ms": round(self.scheduler.max_wait_ms, 2),
+            "autotune": self.autotuner.stats() if self.autotuner is not None else None,
+        }
+
+    async def acquire_worker(self) -> AnyWorker:
         return await self.available_workers.get()
-    
-    async def release_worker(self, worker: Worker):
-        await self.available_workers.put(worker)
\ No newline at end of file
+
+    async def release_worker(self, worker: AnyWorker):
+        if worker.generation != self.generation:
+            self._retire(worker)
+            return
+        await self.available_workers.put(worker)